@@ -21,6 +21,49 @@ f"informative descriptions for open-source Model Context Protcol, here quick int
 "what makes it special, its technical foundation, and the popularity (like GitHub stars)."
 
 
+# Scraped MCP server records (SQLite, one row per link), written by the scraper and enhance_mcp
+REGISTRY_STORE_PATH = os.getenv('REGISTRY_STORE_PATH', 'registry.sqlite')
+# Older exports imported into an empty store on first use
+LEGACY_RECORDS_PATHS = ('all_mcp_server.jsonl', 'all_mcp_server.json')
+
+EMBEDDING_MODEL = "models/text-embedding-004"
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', 'embedding_cache.sqlite')
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '50000'))
+# Cache hits update their LRU time in memory and write it back at most this often
+EMBEDDING_CACHE_TOUCH_SECONDS = float(os.getenv('EMBEDDING_CACHE_TOUCH_SECONDS', '60'))
+EMBEDDING_BATCH_ENABLED = os.getenv('EMBEDDING_BATCH_ENABLED', 'true').lower() == 'true'
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv('EMBEDDING_BATCH_WINDOW_MS', '10'))
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv('EMBEDDING_BATCH_MAX_SIZE', '50'))
+
+QUERY_CACHE_ENABLED = os.getenv('QUERY_CACHE_ENABLED', 'true').lower() == 'true'
+QUERY_CACHE_TTL_SECONDS = float(os.getenv('QUERY_CACHE_TTL_SECONDS', '600'))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '1024'))
+QUERY_TRANSLATION_TTL_SECONDS = float(os.getenv('QUERY_TRANSLATION_TTL_SECONDS', '86400'))
+
+QUERY_PARSER_ENABLED = os.getenv('QUERY_PARSER_ENABLED', 'true').lower() == 'true'
+QUERY_PARSER_MIN_CONFIDENCE = float(os.getenv('QUERY_PARSER_MIN_CONFIDENCE', '0.75'))
+
+RETRIEVER_WARMUP = os.getenv('RETRIEVER_WARMUP', 'true').lower() == 'true'
+RETRIEVER_RELOAD_TOKEN = os.getenv('RETRIEVER_RELOAD_TOKEN')
+RETRIEVER_THREAD_POOL_SIZE = int(os.getenv('RETRIEVER_THREAD_POOL_SIZE', '8'))
+RAG_BATCH_MAX_QUERIES = int(os.getenv('RAG_BATCH_MAX_QUERIES', '100'))
+# Larger k / fetch_k in a request are clamped to these, so one call cannot scan the whole index
+RAG_MAX_K = int(os.getenv('RAG_MAX_K', '20'))
+RAG_MAX_FETCH_K = int(os.getenv('RAG_MAX_FETCH_K', '100'))
+
+ENHANCE_MODEL = os.getenv('ENHANCE_MODEL', 'gemini-2.0-flash-lite')
+# Enhanced descriptions by (prompt version, model, input hash): reruns only send new or changed text
+ENHANCE_CACHE_PATH = os.getenv('ENHANCE_CACHE_PATH', 'enhancement_cache.sqlite')
+# Provider quota for description enhancement, and the AIMD bounds on requests in flight
+ENHANCE_REQUESTS_PER_MINUTE = float(os.getenv('ENHANCE_REQUESTS_PER_MINUTE', '30'))
+ENHANCE_TOKENS_PER_MINUTE = float(os.getenv('ENHANCE_TOKENS_PER_MINUTE', '1000000'))
+ENHANCE_INITIAL_CONCURRENCY = int(os.getenv('ENHANCE_INITIAL_CONCURRENCY', '4'))
+ENHANCE_MAX_CONCURRENCY = int(os.getenv('ENHANCE_MAX_CONCURRENCY', '16'))
+ENHANCE_LATENCY_TARGET_SECONDS = float(os.getenv('ENHANCE_LATENCY_TARGET_SECONDS', '15'))
+ENHANCE_MAX_RETRIES = int(os.getenv('ENHANCE_MAX_RETRIES', '5'))
+
+
 class DescriptionModel(BaseModel):
     description:str
 
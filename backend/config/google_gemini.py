@@ -1,15 +1,22 @@
 import json
 from google import genai
-from google.genai import types
+from google.genai import types, errors
 from config import genai_api_key, SAFE_SETTINGS, EHANCE_DESCRIPTOIN_PROMPT, DescriptionModel, TaskTypeEnum
+from config import EMBEDDING_MODEL, EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES
+from config import EMBEDDING_CACHE_TOUCH_SECONDS
+from config import EMBEDDING_BATCH_ENABLED, EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_BATCH_MAX_SIZE, ENHANCE_MODEL
 from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
+from utils.embedding_cache import CachedEmbeddings
+from utils.embedding_batcher import MicroBatchingEmbeddings
+from utils.rate_limiter import RateLimitError
 
 
 
 # Initialize the API client
 class GeminiClient:
 
-    def __init__(self):
+    def __init__(self, model: str = ENHANCE_MODEL):
+        self.model = model
         self.configure_llm = genai.Client(api_key=genai_api_key)
 
 
@@ -17,7 +24,7 @@ class GeminiClient:
         try:
             llm = self.configure_llm.aio
             response = await llm.models.generate_content(
-                model="gemini-2.0-flash-lite",
+                model=self.model,
                 config=types.GenerateContentConfig(
                     system_instruction=EHANCE_DESCRIPTOIN_PROMPT,
                     safety_settings=SAFE_SETTINGS,
@@ -30,6 +37,12 @@ class GeminiClient:
             if response is None:
                 return contents
             return json.loads(response.text)
+        except errors.APIError as error:
+            if error.code == 429:
+                # Surfaced, not swallowed: the caller's limiter has to back off
+                raise RateLimitError.from_error(error) from error
+            print(f"Failed to generate content by GeminiClient().generate: {error}")
+            return None
         except Exception as error:
             print(f"Failed to generate content by GeminiClient().generate: {error}")
             return None
@@ -39,13 +52,29 @@ class LangchainGeminiClient():
     def __init__(self):
         self.api_key = genai_api_key
 
-    def generate_embeddings(self):
+    def generate_embeddings(self, cache:bool=EMBEDDING_CACHE_ENABLED):
         try:
             embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/text-embedding-004",
+            model=EMBEDDING_MODEL,
             google_api_key=self.api_key,
             task_type=TaskTypeEnum.SEMANTIC_SIMILARITY
             )
+            if EMBEDDING_BATCH_ENABLED:
+                # Concurrent query embeddings that miss the cache share one batched API request
+                embeddings = MicroBatchingEmbeddings(
+                    embeddings,
+                    window_seconds=EMBEDDING_BATCH_WINDOW_MS / 1000,
+                    max_batch_size=EMBEDDING_BATCH_MAX_SIZE
+                )
+            if cache:
+                # Unchanged texts are served from disk instead of re-embedding them on every ingest
+                return CachedEmbeddings(
+                    embeddings,
+                    cache_path=EMBEDDING_CACHE_PATH,
+                    max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+                    model=EMBEDDING_MODEL,
+                    touch_interval=EMBEDDING_CACHE_TOUCH_SECONDS
+                )
 
             return embeddings
         except Exception as error:
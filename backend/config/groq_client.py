@@ -1,6 +1,8 @@
 from groq import Groq
+import groq
 import json
 from config import EHANCE_DESCRIPTOIN_PROMPT, groq_api_key, DescriptionModel
+from utils.rate_limiter import RateLimitError
 
 
 class GroqClient:
@@ -8,6 +10,12 @@ class GroqClient:
         self.client = Groq(api_key=groq_api_key)
 
     async def generate_content(self, contents:str):
+        try:
+            return self._generate_content(contents)
+        except groq.RateLimitError as error:
+            raise RateLimitError.from_error(error) from error
+
+    def _generate_content(self, contents:str):
         chat_completion = self.client.chat.completions.create(
             messages=[
                 # Set an optional system message. This sets the behavior of the
@@ -0,0 +1,90 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+from config import QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_TTL_SECONDS, QUERY_TRANSLATION_TTL_SECONDS
+from vector_store.config import get_index_version
+
+
+_PUNCTUATION = re.compile(r"[^\w\s+#]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    # "Best MCP for Postgres?" and "best mcp  for postgres" share one entry; keep + and # for c++ / c#
+    folded = _PUNCTUATION.sub(" ", query.casefold())
+    return _WHITESPACE.sub(" ", folded).strip()
+
+
+class QueryResultCache:
+    """
+    LRU cache of retriever responses keyed by the normalized query.
+
+    Entries expire after `ttl_seconds`, the oldest entry is evicted past
+    `max_entries`, and everything is dropped as soon as the vector index
+    version changes, i.e. after a re-ingest.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._index_version = get_index_version()
+
+    def _check_index_version(self):
+        index_version = get_index_version()
+        if index_version != self._index_version:
+            self._entries.clear()
+            self._index_version = index_version
+
+    def get(self, query: str, *params) -> Optional[Any]:
+        # Extra params (e.g. k, fetch_k) are part of the key so differently shaped answers don't collide
+        key = (normalize_query(query), params)
+        with self._lock:
+            self._check_index_version()
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, query: str, value: Any, *params):
+        key = (normalize_query(query), params)
+        with self._lock:
+            self._check_index_version()
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+query_cache = QueryResultCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=QUERY_CACHE_TTL_SECONDS
+)
+# Structured queries the LLM produced, so a repeated query never pays for the translation twice
+translation_cache = QueryResultCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=QUERY_TRANSLATION_TTL_SECONDS
+)
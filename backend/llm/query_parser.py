@@ -0,0 +1,234 @@
+import re
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from langchain.schema import Document
+from langchain_core.structured_query import Comparator, Comparison, Operation, Operator, StructuredQuery
+from utils.server_record import parse_stars
+from vector_store.lexical_index import tokenize
+from vector_store.metadata_index import MetadataIndex
+
+
+# Common spellings that are not the language name stored in the metadata
+LANGUAGE_ALIASES = {
+    "py": "python", "golang": "go", "js": "javascript", "node": "javascript", "nodejs": "javascript",
+    "ts": "typescript", "rs": "rust", "csharp": "c#", "cpp": "c++", "kt": "kotlin", "rb": "ruby",
+}
+# Words that only say "find me an MCP server" and carry no search intent
+FILLER_TOKENS = {
+    "a", "an", "the", "for", "with", "to", "of", "in", "on", "and", "that", "which", "is", "are",
+    "i", "me", "my", "need", "want", "looking", "find", "show", "give", "get", "any", "some", "can",
+    "please", "using", "use", "written", "built", "based", "implemented", "language", "lang",
+    "mcp", "mcps", "server", "servers", "tool", "tools", "model", "context", "protocol",
+    "best", "good", "great", "top", "list",
+}
+POPULARITY_PHRASES = [
+    "most starred", "most stars", "highly starred", "highest rated", "top rated",
+    "most popular", "well known", "popular", "famous", "trending",
+]
+# Phrasings the rules cannot express (negation, authorship, recency, alternatives) go to the LLM
+LLM_ONLY_TOKENS = {
+    "not", "without", "except", "excluding", "no", "by", "created", "author", "authored", "made",
+    "maintained", "between", "newer", "older", "recent", "latest", "or", "link", "repo", "github",
+}
+# The count must stand alone: "web3 stars" is not a filter of 3 stars
+_STARS = re.compile(
+    r"(\b(?:more than|over|above|at least|less than|under|below|at most|fewer than)\b|>=|<=|>|<)?\s*"
+    r"(?<![\w.])(\d[\d,.]*\s*[km]?)\s*\+?\s*(?:github\s+)?stars?\b"
+)
+# A bare count right after one of these is a star count; after any other word ("python 3 stars",
+# "top 5 stars") it may be a version or a result limit, and is left for the LLM to confirm
+_STARS_LEADS = {"with", "having", "has", "have", "and"}
+_STARS_COMPARATORS = {
+    None: Comparator.GTE, "more than": Comparator.GT, "over": Comparator.GT, "above": Comparator.GT,
+    ">": Comparator.GT, "at least": Comparator.GTE, ">=": Comparator.GTE, "less than": Comparator.LT,
+    "under": Comparator.LT, "below": Comparator.LT, "fewer than": Comparator.LT, "<": Comparator.LT,
+    "at most": Comparator.LTE, "<=": Comparator.LTE,
+}
+
+
+class ParsedQuery:
+    """Structured query produced by the rules, with how much of the query they explained."""
+
+    def __init__(self, structured_query: StructuredQuery, confidence: float):
+        self.structured_query = structured_query
+        self.confidence = confidence
+
+
+class QueryParser:
+    """
+    Deterministic stand-in for the self-query LLM on predictable phrasings.
+
+    Languages and categories are recognized against the values that actually
+    occur in the ingested metadata, star counts ("over 500 stars") become a
+    stars comparison, and the remaining words form the semantic query. A
+    category only narrows the search when some server under the other
+    filters carries it. A popularity phrase ("most starred") keeps the top
+    decile of the servers the other filters select, and nothing without
+    them. Confidence is the share of content words the rules account for,
+    either as a filter or as a term the index already knows; a popularity
+    phrase is never fully explained, and anything the rules cannot express
+    scores zero.
+    """
+
+    def __init__(self, metadatas: List[dict], vocabulary: Iterable[str] = (),
+                popular_quantile: float = 0.9, max_ngram: int = 3):
+        self.languages = {}
+        self.categories = {}
+        for metadata in metadatas:
+            language = metadata.get('language') or ''
+            if language:
+                self.languages[language.casefold()] = language
+            for category in metadata.get('categories', []) or []:
+                key = tuple(tokenize(category))
+                # Tags made of filler only (e.g. "mcp-server") sit on every record and filter nothing
+                if key and not all(token in FILLER_TOKENS for token in key):
+                    self.categories.setdefault(key, category)
+        self.vocabulary = set(vocabulary)
+        self.max_ngram = max_ngram
+        # Filters are checked against the ingested rows before they are emitted
+        self.metadata_index = MetadataIndex(metadatas)
+        self.stars = np.array([parse_stars(metadata.get('stars')) for metadata in metadatas], dtype=np.int64)
+        self.popular_quantile = popular_quantile
+        # "Popular" is relative to the registry, not a hardcoded star count
+        self.popular_stars = int(np.quantile(self.stars, popular_quantile)) if len(self.stars) else 0
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], vocabulary: Iterable[str] = ()) -> "QueryParser":
+        return cls([document.metadata for document in documents], vocabulary=vocabulary)
+
+    def _language(self, token: str) -> Optional[str]:
+        return self.languages.get(LANGUAGE_ALIASES.get(token, token))
+
+    def _category(self, key: Tuple[str, ...]) -> Optional[str]:
+        if all(token in FILLER_TOKENS for token in key):
+            return None
+        category = self.categories.get(key)
+        if category is None and key[-1].endswith('s'):
+            # "databases" should hit the "database" tag
+            category = self.categories.get(key[:-1] + (key[-1][:-1],))
+        return category
+
+    def _stars_filter(self, text: str) -> Tuple[str, Optional[Comparison], bool]:
+        """Text without the star phrase, the stars comparison, and whether the phrase is unambiguous."""
+        match = _STARS.search(text)
+        if match:
+            comparator = _STARS_COMPARATORS[match.group(1)]
+            value = parse_stars(match.group(2).replace(' ', ''))
+            previous = re.findall(r"\w+", text[:match.start()])
+            certain = match.group(1) is not None or not previous or previous[-1] in _STARS_LEADS
+            return text[:match.start()] + " " + text[match.end():], Comparison(
+                comparator=comparator, attribute="stars", value=value
+            ), certain
+        return text, None, True
+
+    @staticmethod
+    def _popularity(text: str) -> Tuple[str, bool]:
+        """Text without the popularity phrase, and whether there was one."""
+        for phrase in POPULARITY_PHRASES:
+            if re.search(rf"\b{phrase}\b", text):
+                return re.sub(rf"\b{phrase}\b", " ", text), True
+        return text, False
+
+    def _popular_stars(self, scope: dict) -> Optional[Comparison]:
+        # The top decile of the whole registry would drop the very topic asked about
+        # ("most starred kafka"), so popularity only ranks within what the other filters select
+        rows = self.metadata_index.candidates(scope)
+        if rows is None or not rows.size:
+            return None
+        return Comparison(
+            comparator=Comparator.GTE, attribute="stars",
+            value=int(np.quantile(self.stars[rows], self.popular_quantile))
+        )
+
+    def parse(self, query: str) -> ParsedQuery:
+        text, stars, stars_certain = self._stars_filter(query.casefold())
+        popular = False
+        if stars is None:
+            text, popular = self._popularity(text)
+        tokens = tokenize(text)
+        if any(token in LLM_ONLY_TOKENS for token in tokens):
+            return ParsedQuery(StructuredQuery(query=query, filter=None, limit=None), 0.0)
+
+        languages, categories, search_terms = [], [], []
+        # An ambiguous star count is kept as a filter but counts as a word the rules did not explain,
+        # and so does a popularity phrase, which the LLM may read as a ranking the rules cannot express
+        content = 1 if stars or popular else 0
+        explained = 1 if stars and stars_certain else 0
+        position = 0
+        while position < len(tokens):
+            token = tokens[position]
+            # Longest category first, so "developer tools" wins over a lone "developer"
+            for size in range(min(self.max_ngram, len(tokens) - position), 0, -1):
+                key = tuple(tokens[position:position + size])
+                category = self._category(key)
+                if category:
+                    break
+            else:
+                key, category = None, None
+
+            language = self._language(token)
+            if language and (key is None or len(key) == 1):
+                # A language name is a language filter even when it is also used as a tag
+                languages.append(language)
+                explained += 1
+                content += 1
+                position += 1
+            elif key is not None:
+                categories.append(category)
+                # The topic stays in the semantic query; the tag only narrows the candidates
+                search_terms.extend(key)
+                explained += len(key)
+                content += len(key)
+                position += len(key)
+            else:
+                if token not in FILLER_TOKENS:
+                    search_terms.append(token)
+                    content += 1
+                    explained += token in self.vocabulary
+                position += 1
+
+        languages = list(dict.fromkeys(languages))
+        categories = list(dict.fromkeys(categories))
+        scope = {"language": {"$in": languages}} if languages else {}
+        if categories and not self.metadata_index.candidates({**scope, "categories": {"$in": categories}}).size:
+            # No server under the other filters carries the tag (e.g. "postgres" vs "postgresql"):
+            # the topic words stay in the semantic query, which searches without it
+            categories = []
+        if categories:
+            scope["categories"] = {"$in": categories}
+        if popular:
+            stars = self._popular_stars(scope)
+
+        arguments = []
+        if languages:
+            arguments.append(
+                Comparison(comparator=Comparator.EQ, attribute="language", value=languages[0])
+                if len(languages) == 1 else
+                Comparison(comparator=Comparator.IN, attribute="language", value=languages)
+            )
+        if categories:
+            arguments.append(
+                Comparison(comparator=Comparator.EQ, attribute="categories", value=categories[0])
+                if len(categories) == 1 else
+                Comparison(comparator=Comparator.IN, attribute="categories", value=categories)
+            )
+        if stars:
+            arguments.append(stars)
+
+        if len(arguments) > 1:
+            filter = Operation(operator=Operator.AND, arguments=arguments)
+        else:
+            filter = arguments[0] if arguments else None
+        # Nothing left but filters (e.g. "popular python servers"): search on the language itself,
+        # or on what remains once the star phrase is taken out ("servers with 1.2k stars")
+        semantic_query = " ".join(search_terms) or " ".join(languages) or " ".join(tokens) or query
+        # Filler only ("best mcp servers") gives the rules nothing to go on
+        confidence = explained / content if content else 0.0
+        return ParsedQuery(StructuredQuery(query=semantic_query, filter=filter, limit=None), confidence)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "languages": len(self.languages),
+            "categories": len(self.categories),
+            "popular_stars": self.popular_stars,
+        }
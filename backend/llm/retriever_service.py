@@ -0,0 +1,490 @@
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+from langchain.schema import Document
+from langchain.retrievers.self_query.base import SelfQueryRetriever
+from langchain_community.query_constructors.pinecone import PineconeTranslator
+from config import QUERY_CACHE_ENABLED, QUERY_PARSER_ENABLED, QUERY_PARSER_MIN_CONFIDENCE, RETRIEVER_WARMUP
+from config.google_gemini import LangchainGeminiClient
+from llm.query_cache import normalize_query, query_cache, translation_cache
+from llm.query_parser import QueryParser
+from llm.single_flight import SingleFlight
+from utils.async_pool import run_blocking
+from vector_store.config import HYBRID_SEARCH_ENABLED, LEXICAL_TOP_K, VECTOR_STORE_BACKEND, get_index_version
+from vector_store.lexical_index import get_lexical_index, reciprocal_rank_fusion, fused_scores, document_key
+from vector_store.metadata_index import match_filter
+from vector_store.mmr import maximal_marginal_relevance
+from vector_store.manage_vector_store import get_vector_store_manage
+from vector_store.metadata_structure_info import metadata_filed_info
+
+
+DOCUMENT_CONTENT_DESCRIPTION = "Brief description of the MCP tool or project and its purpose."
+WARMUP_QUERIES = ["best MCP server for postgres"]
+
+
+def format_response(response):
+    if response == []:
+        return "Sorry 🥲 we didn't find any suitable MCP for your need"
+    # Top hit stays at the top level for existing clients, alternatives follow in rank order
+    return {
+        "message": response[0].page_content,
+        "metadata": response[0].metadata,
+        "results": [
+            {"message": document.page_content, "metadata": document.metadata}
+            for document in response
+        ]
+    }
+
+
+class RetrieverComponents:
+    """Everything a query needs, built together so a reload swaps them atomically."""
+
+    def __init__(self, verbose: bool = False):
+        self.manager = get_vector_store_manage()
+        self.vectorstore = self.manager.vectorstore
+        self.llm = LangchainGeminiClient().generate_content()
+        self.query_retriever = SelfQueryRetriever.from_llm(
+            llm=self.llm,
+            vectorstore=self.vectorstore,
+            metadata_field_info=metadata_filed_info,
+            document_contents=DOCUMENT_CONTENT_DESCRIPTION,
+            # Local store evaluates the same Pinecone-style filters, so one translator serves both backends
+            structured_query_translator=PineconeTranslator(),
+            verbose=verbose
+        )
+        # Async requests still using this set; a reload closes it only once they are done
+        self.in_flight = 0
+        self.retired = False
+        self._closed = False
+        self.refresh_lexical()
+
+    def refresh_lexical(self):
+        # The BM25 index doubles as the parser's source of ingested metadata and known terms
+        index_version = get_index_version()
+        lexical_index = get_lexical_index(self.vectorstore) if HYBRID_SEARCH_ENABLED or QUERY_PARSER_ENABLED else None
+        self.lexical_index = lexical_index if HYBRID_SEARCH_ENABLED else None
+        self.query_parser = QueryParser.from_documents(
+            lexical_index.documents, vocabulary=lexical_index.idf
+        ) if QUERY_PARSER_ENABLED and lexical_index else None
+        self.index_version = index_version
+
+    async def aopen(self):
+        # Keeps Pinecone's async HTTP client open across requests instead of one per query
+        if hasattr(self.vectorstore, '__aenter__'):
+            await self.vectorstore.__aenter__()
+
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        if hasattr(self.vectorstore, 'aclose'):
+            await self.vectorstore.aclose()
+
+    @asynccontextmanager
+    async def lease(self):
+        self.in_flight += 1
+        try:
+            yield self
+        finally:
+            self.in_flight -= 1
+            if self.retired and not self.in_flight:
+                await self.aclose()
+
+    async def aretire(self):
+        # Replaced by a reload: closed now if idle, otherwise by the last request holding a lease
+        self.retired = True
+        if not self.in_flight:
+            await self.aclose()
+
+
+class RetrieverService:
+    """
+    Long-lived retrieval pipeline shared by the MCP tool and the HTTP routes.
+
+    The vector store client, LLM and self-query chain are built once and
+    reused, so a query pays only for its own LLM, embedding and search
+    calls. `reload()` rebuilds them explicitly. When the index version
+    changes after an ingest, the local backend is reloaded and every backend
+    rebuilds its BM25 index and query parser. Async requests lease the
+    component set they started with, so `areload()` closes the old clients
+    only after the last of those requests finishes.
+
+    `asearch` / `aretrieve` are the event-loop friendly twins used by the
+    server: the LLM, embedding and Pinecone calls are awaited natively and
+    the remaining sync steps run on a bounded thread pool.
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.components = None
+        self.rule_translations = 0
+        self.llm_translations = 0
+        self.single_flight = SingleFlight()
+        self._reload_lock = threading.Lock()
+
+    def start(self, warmup: bool = RETRIEVER_WARMUP):
+        self.reload()
+        if warmup:
+            self.warmup()
+        return self
+
+    def reload(self):
+        with self._reload_lock:
+            started = time.perf_counter()
+            self.components = RetrieverComponents(verbose=self.verbose)
+            print(f"Retriever service ready in {time.perf_counter() - started:.2f}s")
+
+    async def areload(self):
+        previous = self.components
+        await run_blocking(self.reload)
+        await self.components.aopen()
+        if previous is not None and previous is not self.components:
+            await previous.aretire()
+
+    def warmup(self, queries=WARMUP_QUERIES):
+        # Opens the LLM, embedding and vector store connections before the first real request
+        for query in queries:
+            try:
+                self.retrieve(query, use_cache=False)
+            except Exception as error:
+                print(f"Retriever warmup query failed RetrieverService().warmup(): {error}")
+
+    def _current_components(self) -> RetrieverComponents:
+        components = self.components
+        if components is None:
+            self.reload()
+            return self.components
+        if components.index_version == get_index_version():
+            return components
+        if VECTOR_STORE_BACKEND == 'local':
+            # The in-process index was re-ingested by another process, map the new files
+            with self._reload_lock:
+                if self.components is components:
+                    self.components = RetrieverComponents(verbose=self.verbose)
+            return self.components
+        # Pinecone already serves the new vectors; only the lexical side is rebuilt from the new documents
+        with self._reload_lock:
+            if components.index_version != get_index_version():
+                components.refresh_lexical()
+        return components
+
+    @asynccontextmanager
+    async def _leased_components(self):
+        while True:
+            components = await run_blocking(self._current_components)
+            # Nothing awaits between this check and the lease, so a retired set is never handed out
+            if not components.retired:
+                break
+        async with components.lease():
+            yield components
+
+    def _parse_locally(self, components: RetrieverComponents, query: str):
+        # Predictable phrasings are parsed locally; only ambiguous ones pay for the LLM round trip
+        if components.query_parser:
+            parsed = components.query_parser.parse(query)
+            if parsed.confidence >= QUERY_PARSER_MIN_CONFIDENCE:
+                self.rule_translations += 1
+                return parsed.structured_query
+        return translation_cache.get(query)
+
+    def translate(self, components: RetrieverComponents, query: str):
+        structured_query = self._parse_locally(components, query)
+        if structured_query is None:
+            structured_query = components.query_retriever.query_constructor.invoke({"query": query})
+            translation_cache.set(query, structured_query)
+            self.llm_translations += 1
+        return structured_query
+
+    async def atranslate(self, components: RetrieverComponents, query: str):
+        structured_query = self._parse_locally(components, query)
+        if structured_query is None:
+            structured_query = await components.query_retriever.query_constructor.ainvoke({"query": query})
+            translation_cache.set(query, structured_query)
+            self.llm_translations += 1
+        return structured_query
+
+    def _exact_match(self, components: RetrieverComponents, query: str, k: int,
+                    lambda_mult: float) -> Tuple[List[Document], bool]:
+        """Servers the query names exactly, and whether they and their BM25 neighbours fill all k results."""
+        # A query that names a server exactly is answered lexically, without the LLM or an embedding
+        lexical_index = components.lexical_index
+        response = lexical_index.exact_match(query) if lexical_index else []
+        if not response:
+            return [], False
+        if len(response) >= k:
+            return response[:k], True
+        # The named servers lead; BM25 neighbours fill the rest, diversified by MMR against them
+        exact = {document_key(document) for document in response}
+        hits = [
+            (document, score) for document, score in lexical_index.search(query, k=max(LEXICAL_TOP_K, k))
+            if document_key(document) not in exact
+        ]
+        vectors = components.vectorstore.vectors_by_ids(
+            [document.id for document in response] + [document.id for document, _ in hits]
+        )
+        leading = [document for document in response if document.id in vectors]
+        pool = leading + [document for document, _ in hits if document.id in vectors]
+        top = max([score for _, score in hits], default=1.0)
+        relevance = [top] * len(leading) + [score for document, score in hits if document.id in vectors]
+        selected = maximal_marginal_relevance(
+            None, [vectors[document.id] for document in pool], k=k, lambda_mult=lambda_mult,
+            relevance=relevance, selected=range(len(leading))
+        ) if pool else []
+        unindexed = [document for document in response if document.id not in vectors]
+        filled = (unindexed + [pool[i] for i in selected])[:k]
+        if len(filled) >= k:
+            return filled, True
+        # Too few neighbours share the query's words: the regular search fills the rest behind the named servers
+        return response, False
+
+    @staticmethod
+    def _pin(pinned: List[Document], response: List[Document], k: int) -> List[Document]:
+        keys = {document_key(document) for document in pinned}
+        return (pinned + [document for document in response if document_key(document) not in keys])[:k]
+
+    def _search_arguments(self, components: RetrieverComponents, query: str, structured_query,
+                        k: int, fetch_k: int, lambda_mult: float):
+        # Same arguments SelfQueryRetriever derives, built through its public translator
+        retriever = components.query_retriever
+        new_query, translated = retriever.structured_query_translator.visit_structured_query(structured_query)
+        search_kwargs = {**retriever.search_kwargs, **translated}
+        if structured_query.limit is not None:
+            search_kwargs["k"] = structured_query.limit
+        if retriever.use_original_query:
+            new_query = query
+        search_kwargs.setdefault("k", k)
+        # Several results are diversified with MMR over the fetch_k nearest candidates
+        if search_kwargs["k"] > 1:
+            search_kwargs.update({"fetch_k": max(fetch_k, search_kwargs["k"]), "lambda_mult": lambda_mult})
+            return new_query, "mmr", search_kwargs
+        return new_query, "similarity", search_kwargs
+
+    def _lexical_hits(self, components: RetrieverComponents, query: str, filter: Optional[dict],
+                    k: int) -> List[Document]:
+        # Lexical hits must honour the same metadata filter derived for the vector search
+        return [
+            document for document, _ in components.lexical_index.search(query, k=max(LEXICAL_TOP_K, k))
+            if match_filter(document.metadata, filter)
+        ]
+
+    def _fuse(self, components: RetrieverComponents, query: str, response: List[Document],
+            filter: Optional[dict], k: int) -> List[Document]:
+        if components.lexical_index:
+            response = reciprocal_rank_fusion([response, self._lexical_hits(components, query, filter, k)])
+        return response[:k]
+
+    @staticmethod
+    def _unfetched_ids(candidates: list, lexical: List[Document]) -> List[str]:
+        fetched = {document.id for document, _ in candidates}
+        return [document.id for document in lexical if document.id and document.id not in fetched]
+
+    def _fuse_mmr(self, embedding: List[float], candidates: list, lexical: List[Document], vectors: dict,
+                k: int, lambda_mult: float) -> List[Document]:
+        """MMR over the fused pool: RRF relevance traded against similarity to the servers already picked."""
+        vectors = {**vectors, **{document.id: vector for document, vector in candidates}}
+        # A lexical hit whose vector is not in the index cannot be compared for diversity
+        pool = [
+            (document, score) for document, score in fused_scores([[document for document, _ in candidates], lexical])
+            if document.id in vectors
+        ]
+        if not pool:
+            return []
+        selected = maximal_marginal_relevance(
+            embedding, [vectors[document.id] for document, _ in pool], k=k, lambda_mult=lambda_mult,
+            relevance=[score for _, score in pool]
+        )
+        return [pool[i][0] for i in selected]
+
+    def _hybrid_mmr(self, components: RetrieverComponents, query: str, embedding: List[float],
+                    search_kwargs: dict, k: int, lambda_mult: float) -> List[Document]:
+        # Vector (fetch_k) and lexical candidates are fused first, so MMR decides the final order
+        filter = search_kwargs.get("filter")
+        candidates = components.vectorstore.candidates_by_vector(
+            embedding, fetch_k=search_kwargs["fetch_k"], filter=filter
+        )
+        lexical = self._lexical_hits(components, query, filter, k)
+        vectors = components.vectorstore.vectors_by_ids(self._unfetched_ids(candidates, lexical))
+        return self._fuse_mmr(embedding, candidates, lexical, vectors, k, lambda_mult)
+
+    async def _ahybrid_mmr(self, components: RetrieverComponents, query: str, embedding: List[float],
+                        search_kwargs: dict, k: int, lambda_mult: float) -> List[Document]:
+        filter = search_kwargs.get("filter")
+        candidates = await components.vectorstore.acandidates_by_vector(
+            embedding, fetch_k=search_kwargs["fetch_k"], filter=filter
+        )
+        lexical = await run_blocking(self._lexical_hits, components, query, filter, k)
+        vectors = await components.vectorstore.avectors_by_ids(self._unfetched_ids(candidates, lexical))
+        return await run_blocking(self._fuse_mmr, embedding, candidates, lexical, vectors, k, lambda_mult)
+
+    def search(self, query: str, k: int = 1, fetch_k: int = 20, lambda_mult: float = 0.5):
+        components = self._current_components()
+        pinned, complete = self._exact_match(components, query, k, lambda_mult)
+        if complete:
+            return pinned
+
+        # Enough results to fill k once the pinned exact matches are taken out
+        fill = k + len(pinned)
+        structured_query = self.translate(components, query)
+        new_query, search_type, search_kwargs = self._search_arguments(
+            components, query, structured_query, fill, fetch_k, lambda_mult
+        )
+        if search_type == "mmr" and components.lexical_index:
+            embedding = components.vectorstore.embeddings.embed_query(new_query)
+            response = self._hybrid_mmr(components, query, embedding, search_kwargs, fill, lambda_mult)
+        else:
+            response = components.vectorstore.search(new_query, search_type, **search_kwargs)
+            response = self._fuse(components, query, response, search_kwargs.get("filter"), fill)
+        return self._pin(pinned, response, k)
+
+    async def _asearch_by_vector(self, components: RetrieverComponents, embedding: List[float],
+                                search_type: str, search_kwargs: dict) -> List[Document]:
+        if search_type == "mmr":
+            return await components.vectorstore.amax_marginal_relevance_search_by_vector(embedding, **search_kwargs)
+        return await components.vectorstore.asimilarity_search_by_vector(embedding, **search_kwargs)
+
+    async def abatch_search(self, queries: List[str], k: int = 1, fetch_k: int = 20,
+                            lambda_mult: float = 0.5) -> List[List[Document]]:
+        """Search many queries at once: one translation per query, one embedding call for all."""
+        async with self._leased_components() as components:
+            return await self._abatch_search(components, queries, k, fetch_k, lambda_mult)
+
+    async def _abatch_search(self, components: RetrieverComponents, queries: List[str], k: int, fetch_k: int,
+                            lambda_mult: float) -> List[List[Document]]:
+        matches = await run_blocking(
+            lambda: [self._exact_match(components, query, k, lambda_mult) for query in queries]
+        )
+        responses = [pinned for pinned, _ in matches]
+        pending = [position for position, (_, complete) in enumerate(matches) if not complete]
+        if not pending:
+            return responses
+
+        fills = {position: k + len(responses[position]) for position in pending}
+        structured_queries = await asyncio.gather(*[self.atranslate(components, queries[position]) for position in pending])
+        arguments = [
+            self._search_arguments(components, queries[position], structured_query, fills[position], fetch_k, lambda_mult)
+            for position, structured_query in zip(pending, structured_queries)
+        ]
+        # The Gemini client pins one task type, so a batched document embedding of a query is its query embedding
+        embeddings = await components.vectorstore.embeddings.aembed_documents([new_query for new_query, _, _ in arguments])
+        found = await asyncio.gather(*[
+            self._ahybrid_mmr(components, queries[position], embedding, search_kwargs, fills[position], lambda_mult)
+            if search_type == "mmr" and components.lexical_index else
+            self._asearch_by_vector(components, embedding, search_type, search_kwargs)
+            for position, embedding, (_, search_type, search_kwargs) in zip(pending, embeddings, arguments)
+        ])
+        fused = await run_blocking(lambda: [
+            response if search_type == "mmr" and components.lexical_index else
+            self._fuse(components, queries[position], response, search_kwargs.get("filter"), fills[position])
+            for position, response, (_, search_type, search_kwargs) in zip(pending, found, arguments)
+        ])
+        for position, response in zip(pending, fused):
+            responses[position] = self._pin(responses[position], response, k)
+        return responses
+
+    async def asearch(self, query: str, k: int = 1, fetch_k: int = 20, lambda_mult: float = 0.5):
+        async with self._leased_components() as components:
+            return await self._asearch(components, query, k, fetch_k, lambda_mult)
+
+    async def _asearch(self, components: RetrieverComponents, query: str, k: int, fetch_k: int,
+                    lambda_mult: float):
+        pinned, complete = await run_blocking(self._exact_match, components, query, k, lambda_mult)
+        if complete:
+            return pinned
+
+        fill = k + len(pinned)
+        structured_query = await self.atranslate(components, query)
+        new_query, search_type, search_kwargs = self._search_arguments(
+            components, query, structured_query, fill, fetch_k, lambda_mult
+        )
+        if search_type == "mmr" and components.lexical_index:
+            embedding = await components.vectorstore.embeddings.aembed_query(new_query)
+            response = await self._ahybrid_mmr(components, query, embedding, search_kwargs, fill, lambda_mult)
+        else:
+            response = await components.vectorstore.asearch(new_query, search_type, **search_kwargs)
+            response = await run_blocking(self._fuse, components, query, response, search_kwargs.get("filter"), fill)
+        return self._pin(pinned, response, k)
+
+    def retrieve(self, query: str, k: int = 1, fetch_k: int = 20, lambda_mult: float = 0.5,
+                use_cache: bool = QUERY_CACHE_ENABLED):
+        if use_cache:
+            cached = query_cache.get(query, k, fetch_k, lambda_mult)
+            if cached is not None:
+                return cached
+
+        content = format_response(self.search(query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult))
+        if use_cache:
+            query_cache.set(query, content, k, fetch_k, lambda_mult)
+        return content
+
+    async def aretrieve(self, query: str, k: int = 1, fetch_k: int = 20, lambda_mult: float = 0.5,
+                        use_cache: bool = QUERY_CACHE_ENABLED):
+        if use_cache:
+            cached = query_cache.get(query, k, fetch_k, lambda_mult)
+            if cached is not None:
+                return cached
+
+        async def compute():
+            content = format_response(await self.asearch(query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult))
+            if use_cache:
+                query_cache.set(query, content, k, fetch_k, lambda_mult)
+            return content
+
+        # Identical queries arriving together share one LLM + embedding + search round trip
+        key = (normalize_query(query), k, fetch_k, lambda_mult)
+        return await self.single_flight.do(key, compute)
+
+    async def aretrieve_batch(self, queries: List[str], k: int = 1, fetch_k: int = 20, lambda_mult: float = 0.5,
+                            use_cache: bool = QUERY_CACHE_ENABLED) -> list:
+        contents = [query_cache.get(query, k, fetch_k, lambda_mult) if use_cache else None for query in queries]
+        missing = [position for position, content in enumerate(contents) if content is None]
+        if missing:
+            responses = await self.abatch_search([queries[position] for position in missing], k=k,
+                                                fetch_k=fetch_k, lambda_mult=lambda_mult)
+            for position, response in zip(missing, responses):
+                contents[position] = format_response(response)
+                if use_cache:
+                    query_cache.set(queries[position], contents[position], k, fetch_k, lambda_mult)
+        return contents
+
+    async def astream_retrieve(self, queries: List[str], k: int = 1, fetch_k: int = 20, lambda_mult: float = 0.5,
+                            use_cache: bool = QUERY_CACHE_ENABLED):
+        """Yield (position, response or error) for each query as soon as its own answer is ready."""
+        async def retrieve(position: int, query: str):
+            try:
+                return position, await self.aretrieve(query, k=k, fetch_k=fetch_k,
+                                                    lambda_mult=lambda_mult, use_cache=use_cache), None
+            except Exception as error:
+                return position, None, str(error)
+
+        tasks = [asyncio.ensure_future(retrieve(position, query)) for position, query in enumerate(queries)]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            # The client stopped reading (disconnected): the answers still pending are not needed
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "query_cache": query_cache.stats(),
+            "translation_cache": translation_cache.stats(),
+            "single_flight": self.single_flight.stats(),
+            "rule_translations": self.rule_translations,
+            "llm_translations": self.llm_translations,
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_retriever_service() -> RetrieverService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = RetrieverService().start()
+    return _service
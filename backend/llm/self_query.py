@@ -1,35 +1,44 @@
-from langchain.retrievers.self_query.base import SelfQueryRetriever
-from config.google_gemini import LangchainGeminiClient
-from vector_store.manage_vector_store import PineconeVectorStoreManage
-from vector_store.metadata_structure_info import metadata_filed_info
+from config import QUERY_CACHE_ENABLED
+from llm.retriever_service import get_retriever_service
+from utils.async_pool import run_blocking
 
 
-DOCUMENT_CONTENT_DESCRIPTION = "Brief description of the MCP tool or project and its purpose."
-
-def self_query_retriever(query:str, verbose:bool=True):
+def self_query_retriever(query:str,
+                        k:int=1,
+                        fetch_k:int=20,
+                        lambda_mult:float=0.5,
+                        use_cache:bool=QUERY_CACHE_ENABLED):
     try:
-        llm = LangchainGeminiClient().generate_content()
-        vector_store = PineconeVectorStoreManage().vectorstore
-
-        query_retriever = SelfQueryRetriever.from_llm(
-            llm=llm,
-            vectorstore=vector_store,
-            metadata_field_info=metadata_filed_info,
-            document_contents=DOCUMENT_CONTENT_DESCRIPTION,
-            verbose=verbose
+        # The service is built once per process and reused, see llm/retriever_service.py
+        return get_retriever_service().retrieve(
+            query,
+            k=k,
+            fetch_k=fetch_k,
+            lambda_mult=lambda_mult,
+            use_cache=use_cache
         )
-        response = query_retriever.invoke(query)
-        if response == []:
-            return "Sorry 🥲 we didn't find any suitable MCP for your need"
-        content = {
-            "message": response[0].page_content,
-            "metadata": response[0].metadata
-        }
-        return content
-
     except Exception as error:
         print(f"Failed to generate content by self_query_retriever: {error}")
 
+
+async def aself_query_retriever(query:str,
+                                k:int=1,
+                                fetch_k:int=20,
+                                lambda_mult:float=0.5,
+                                use_cache:bool=QUERY_CACHE_ENABLED):
+    try:
+        # Awaits the LLM, embedding and vector store calls instead of blocking the event loop
+        service = await run_blocking(get_retriever_service)
+        return await service.aretrieve(
+            query,
+            k=k,
+            fetch_k=fetch_k,
+            lambda_mult=lambda_mult,
+            use_cache=use_cache
+        )
+    except Exception as error:
+        print(f"Failed to generate content by aself_query_retriever: {error}")
+
 # if __name__ == '__main__':
 #     query = "What is best MCP for prisma with more star"
 #     print(self_query_retriever(query))
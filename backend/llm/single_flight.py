@@ -0,0 +1,61 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one in-flight computation.
+
+    The first caller for a key starts the work as its own task; callers
+    arriving while it runs await the same task instead of starting another.
+    The task is shielded, so a caller that disconnects does not cancel the
+    answer the others are still waiting for; it is cancelled only when the
+    last caller waiting for it is. Nothing is kept once it finishes;
+    caching results is the query cache's job.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+        self._in_flight = {}
+        self._waiters = Counter()
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(function())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not task.done():
+                    # Every caller left (e.g. their clients disconnected): nobody needs the answer
+                    self.abandoned += 1
+                    self._forget(key, task)
+                    task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        # A cancelled task is forgotten at once, so the next caller starts a fresh one
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "in_flight": len(self._in_flight),
+        }
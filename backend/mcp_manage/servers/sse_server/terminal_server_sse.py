@@ -31,7 +31,10 @@ The server uses:
 
 
 import os
+import json
+import math
 import subprocess  # For running shell commands
+from contextlib import asynccontextmanager
 
 from mcp.server.fastmcp import FastMCP  # Core MCP wrapper to define tools and expose them
 from mcp.server import Server  # Underlying server abstraction used by FastMCP
@@ -41,6 +44,7 @@ from starlette.applications import Starlette  # Web framework to define routes
 from starlette.routing import Route, Mount  # Routing for HTTP and message endpoints
 from starlette.requests import Request  # HTTP request objects
 from starlette.responses import JSONResponse # JsonResponse for rag retrieve query
+from starlette.responses import StreamingResponse # NDJSON stream for batched rag queries
 from starlette.exceptions import HTTPException
 from starlette.middleware import Middleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
@@ -50,7 +54,10 @@ from starlette.middleware.cors import CORSMiddleware
 
 import uvicorn  # ASGI server to run the Starlette app
 
-from llm.self_query import self_query_retriever
+from config import RETRIEVER_RELOAD_TOKEN, RAG_BATCH_MAX_QUERIES, RAG_MAX_K, RAG_MAX_FETCH_K
+from llm.self_query import aself_query_retriever
+from llm.retriever_service import get_retriever_service
+from utils.async_pool import run_blocking
 
 middleware = [
     Middleware(
@@ -65,6 +72,26 @@ middleware = [
 ]
 
 
+def search_parameters(k=1, fetch_k=20, lambda_mult=0.5) -> tuple:
+    """
+    Validated (k, fetch_k, lambda_mult) of a retrieval request.
+
+    k and fetch_k are clamped to 1..RAG_MAX_K and k..RAG_MAX_FETCH_K and
+    lambda_mult to 0..1. Raises ValueError when a value is not a number.
+    """
+    try:
+        if isinstance(k, bool) or isinstance(fetch_k, bool):
+            raise TypeError("a boolean is not a count")
+        k, fetch_k, lambda_mult = int(k), int(fetch_k), float(lambda_mult)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"'k' and 'fetch_k' must be integers and 'lambda_mult' a number: {error}")
+    if not math.isfinite(lambda_mult):
+        raise ValueError("'lambda_mult' must be a finite number")
+    k = min(max(k, 1), RAG_MAX_K)
+    fetch_k = min(max(fetch_k, k), max(RAG_MAX_FETCH_K, k))
+    return k, fetch_k, min(max(lambda_mult, 0.0), 1.0)
+
+
 # --------------------------------------------------------------------------------------
 # STEP 1: Initialize FastMCP instance — this acts as your "tool server"
 # --------------------------------------------------------------------------------------
@@ -123,7 +150,7 @@ async def add_numbers(a: float, b: float) -> float:
 # TOOL 3: reterive_mcp_data — adds two numbers and returns the result
 # --------------------------------------------------------------------------------------
 @mcp.tool()
-async def reterive_mcp_data(query:str) -> str:
+async def reterive_mcp_data(query:str, k:int=1, fetch_k:int=20, lambda_mult:float=0.5) -> str:
     """
     Retrieves information related to the MCP (Modular Control Platform) server based on the provided query.
 
@@ -132,12 +159,16 @@ async def reterive_mcp_data(query:str) -> str:
     
     Args:
         query (str): The search query to retrieve specific information from the MCP server.
+        k (int): How many ranked MCP servers to return; more than 1 returns diverse alternatives.
+        fetch_k (int): How many nearest candidates to diversify from when k > 1.
+        lambda_mult (float): 1.0 ranks purely by relevance, 0.0 purely by diversity.
 
     Returns:
         str: The result or response fetched from the MCP server based on the query.
     """
     try:
-        return self_query_retriever(query=query)
+        k, fetch_k, lambda_mult = search_parameters(k, fetch_k, lambda_mult)
+        return await aself_query_retriever(query=query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult)
     except Exception as error:
         return f"Got error when running mcp tool reterive_mcp_data() {error}"
 
@@ -180,8 +211,17 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
         try:
             req_body = await req.json()
             print(req_body)
-            query = req_body['query']
-            response = self_query_retriever(query=query)
+            query = req_body.get('query') if isinstance(req_body, dict) else None
+            if not isinstance(query, str) or not query.strip():
+                raise ValueError("'query' must be a non-empty string")
+            k, fetch_k, lambda_mult = search_parameters(
+                req_body.get('k', 1), req_body.get('fetch_k', 20), req_body.get('lambda_mult', 0.5)
+            )
+        except ValueError as error:
+            # Also covers a body that is not JSON
+            return JSONResponse({"error": str(error)}, status_code=400)
+        try:
+            response = await aself_query_retriever(query=query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult)
             return JSONResponse(
                 response,
                 status_code=200
@@ -193,6 +233,69 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
                },
                status_code=404
             )
+    async def rag_query_batch(req: Request):
+        # Many queries in one call: JSON list in query order, or NDJSON lines as each one finishes
+        try:
+            req_body = await req.json()
+            queries = req_body.get('queries') if isinstance(req_body, dict) else None
+            if (not isinstance(queries, list) or not queries or len(queries) > RAG_BATCH_MAX_QUERIES
+                    or not all(isinstance(query, str) and query.strip() for query in queries)):
+                raise ValueError(f"'queries' must be a list of 1 to {RAG_BATCH_MAX_QUERIES} non-empty strings")
+            k, fetch_k, lambda_mult = search_parameters(
+                req_body.get('k', 1), req_body.get('fetch_k', 20), req_body.get('lambda_mult', 0.5)
+            )
+        except ValueError as error:
+            return JSONResponse({"error": str(error)}, status_code=400)
+        # Repeated queries are searched once and answered at every position they were asked
+        positions = {}
+        for position, query in enumerate(queries):
+            positions.setdefault(query, []).append(position)
+        unique = list(positions)
+        service = await run_blocking(get_retriever_service)
+
+        if req_body.get('stream'):
+            async def lines():
+                async for position, response, error in service.astream_retrieve(
+                    unique, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+                ):
+                    for index in positions[unique[position]]:
+                        line = {"index": index, "query": unique[position]}
+                        line.update({"error": error} if error else {"response": response})
+                        yield json.dumps(line, ensure_ascii=False) + "\n"
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        try:
+            responses = await service.aretrieve_batch(unique, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult)
+            answers = dict(zip(unique, responses))
+            return JSONResponse(
+                [{"query": query, "response": answers[query]} for query in queries],
+                status_code=200
+            )
+        except Exception as error:
+            return JSONResponse(f"Internal Error {error}", status_code=500)
+
+    async def reload_retriever(req: Request) -> JSONResponse:
+        # Rebuilds vector store, LLM and self-query clients, e.g. after switching indexes
+        if not RETRIEVER_RELOAD_TOKEN or req.headers.get("x-reload-token") != RETRIEVER_RELOAD_TOKEN:
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        try:
+            await get_retriever_service().areload()
+            return JSONResponse("Retriever reloaded", status_code=200)
+        except Exception as error:
+            return JSONResponse(f"Internal Error {error}", status_code=500)
+
+    async def retriever_stats(req: Request) -> JSONResponse:
+        # Cache, single-flight and query translation counters
+        return JSONResponse(get_retriever_service().stats(), status_code=200)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        # Build and warm the retriever once, before the first request arrives
+        service = await run_blocking(get_retriever_service)
+        await service.components.aopen()
+        yield
+        await service.components.aclose()
+
     async def health(req:Request) -> JSONResponse:
         try:
             return JSONResponse(    
@@ -208,10 +311,14 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
     return Starlette(
         debug=debug,
         middleware=middleware,
+        lifespan=lifespan,
         routes=[
             Route("/sse", endpoint=handle_sse),          # For initiating SSE connection
             Mount("/messages/", app=sse.handle_post_message),  # For POST-based communication
             Route("/rag_query", rag_query_retrieve, methods=["POST"]),
+            Route("/rag_query/batch", rag_query_batch, methods=["POST"]),
+            Route("/admin/reload", reload_retriever, methods=["POST"]),
+            Route("/stats", retriever_stats, methods=["GET"]),
             Route("/", health, methods=["GET"]),
         ],
     )
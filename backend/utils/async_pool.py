@@ -0,0 +1,14 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from config import RETRIEVER_THREAD_POOL_SIZE
+
+
+# Shared by every async request; bounded so a burst of queries cannot spawn unbounded threads
+_executor = ThreadPoolExecutor(max_workers=RETRIEVER_THREAD_POOL_SIZE, thread_name_prefix="retriever")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a synchronous step (SQLite, NumPy, client setup) off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from typing import List
+from langchain_core.embeddings import Embeddings
+
+
+class _Batch:
+
+    def __init__(self, event_type):
+        self.texts = []
+        self.full = event_type()
+        self.done = event_type()
+        self.vectors = None
+        self.error = None
+        self.task = None
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Coalesces concurrent `embed_query` calls into one `embed_documents` request.
+
+    The first query to arrive opens a batch and waits up to `window_seconds`
+    (or until `max_batch_size` queries joined), then embeds the whole batch
+    in a single call and hands every waiter its own vector. Sync callers
+    (threads) and async callers (one event loop) batch separately.
+    Document embedding passes straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, window_seconds: float = 0.01, max_batch_size: int = 50):
+        self.embeddings = embeddings
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._open = None
+        self._async_open = None
+
+    def __getattr__(self, name):
+        # model, task_type, ... of the wrapped client stay visible to the embedding cache
+        if name == 'embeddings':
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def _join(self, text: str, attribute: str, event_type):
+        with self._lock:
+            batch = getattr(self, attribute)
+            leader = batch is None
+            if leader:
+                batch = _Batch(event_type)
+                setattr(self, attribute, batch)
+            position = len(batch.texts)
+            batch.texts.append(text)
+            self.queries += 1
+            if len(batch.texts) >= self.max_batch_size:
+                setattr(self, attribute, None)
+                batch.full.set()
+        return batch, position, leader
+
+    def _close(self, batch: _Batch, attribute: str):
+        with self._lock:
+            if getattr(self, attribute) is batch:
+                setattr(self, attribute, None)
+            self.batches += 1
+
+    def _result(self, batch: _Batch, position: int) -> List[float]:
+        if batch.error is not None:
+            raise batch.error
+        return batch.vectors[position]
+
+    def embed_query(self, text: str) -> List[float]:
+        batch, position, leader = self._join(text, '_open', threading.Event)
+        if leader:
+            batch.full.wait(self.window_seconds)
+            self._close(batch, '_open')
+            try:
+                # The Gemini client pins one task type, so document vectors of the queries are query vectors
+                batch.vectors = self.embeddings.embed_documents(batch.texts)
+            except Exception as error:
+                batch.error = error
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+        return self._result(batch, position)
+
+    async def _run_async_batch(self, batch: _Batch):
+        try:
+            await asyncio.wait_for(batch.full.wait(), self.window_seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._close(batch, '_async_open')
+        try:
+            batch.vectors = await self.embeddings.aembed_documents(batch.texts)
+        except Exception as error:
+            batch.error = error
+        finally:
+            batch.done.set()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        batch, position, leader = self._join(text, '_async_open', asyncio.Event)
+        if leader:
+            # Its own task, so a cancelled first caller does not strand the rest of the batch
+            batch.task = asyncio.ensure_future(self._run_async_batch(batch))
+        await batch.done.wait()
+        return self._result(batch, position)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "batches": self.batches,
+            "average_batch_size": self.queries / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,190 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
+from utils.async_pool import run_blocking
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings object with a persistent SQLite cache.
+
+    Vectors are keyed by (model, task type, sha256 of the text), so an
+    unchanged description is never sent to the provider twice. The cache
+    is bounded to `max_entries` and evicts least recently used rows.
+    Hits only record their use time in memory; the times are written in one
+    batch every `touch_interval` seconds or before an eviction, so a hit
+    costs no write.
+    """
+
+    def __init__(self,
+                embeddings: Embeddings,
+                cache_path: str,
+                max_entries: int = 50000,
+                model: Optional[str] = None,
+                touch_interval: float = 60.0):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.model = model or getattr(embeddings, 'model', type(embeddings).__name__)
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._touched = {}
+        self._touched_flushed = time.monotonic()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._connection.commit()
+
+    def _task_type(self, default: str) -> str:
+        task_type = getattr(self.embeddings, 'task_type', None) or default
+        return str(getattr(task_type, 'value', task_type)).lower()
+
+    def _key(self, text: str, task_type: str) -> str:
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{self.model}:{task_type}:{content_hash}"
+
+    def _lookup(self, keys: List[str]) -> dict:
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+            if found:
+                now = time.time()
+                self._touched.update((key, now) for key in found)
+                if time.monotonic() - self._touched_flushed >= self.touch_interval:
+                    self._flush_touched()
+                    self._connection.commit()
+        return found
+
+    def _flush_touched(self):
+        # Caller holds the lock; only LRU order depends on these, so losing some at exit is harmless
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched = {}
+        self._touched_flushed = time.monotonic()
+
+    def _store(self, items: dict):
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, array('f', vector).tobytes(), now) for key, vector in items.items()]
+            )
+            overflow = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                # Eviction must see recent hits, or it could drop a row that is in use
+                self._flush_touched()
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+            self._connection.commit()
+
+    def _count(self, hits: int, misses: int):
+        # Sync callers run on the thread pool concurrently, so += must not race
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _missing(self, keys: List[str], texts: List[str], cached: dict) -> dict:
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        self._count(sum(1 for key in keys if key in cached), len(missing))
+        return missing
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        task_type = self._task_type('retrieval_document')
+        keys = [self._key(text, task_type) for text in texts]
+        cached = self._lookup(keys)
+
+        missing = self._missing(keys, texts, cached)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text, self._task_type('retrieval_query'))
+        cached = self._lookup([key])
+        if key in cached:
+            self._count(1, 0)
+            return cached[key]
+
+        self._count(0, 1)
+        vector = self.embeddings.embed_query(text)
+        self._store({key: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # SQLite stays on the bounded pool, the provider call uses its native async client
+        task_type = self._task_type('retrieval_document')
+        keys = [self._key(text, task_type) for text in texts]
+        cached = await run_blocking(self._lookup, keys)
+
+        missing = self._missing(keys, texts, cached)
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            await run_blocking(self._store, computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text, self._task_type('retrieval_query'))
+        cached = await run_blocking(self._lookup, [key])
+        if key in cached:
+            self._count(1, 0)
+            return cached[key]
+
+        self._count(0, 1)
+        vector = await self.embeddings.aembed_query(text)
+        await run_blocking(self._store, {key: vector})
+        return vector
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM embeddings")
+            self._connection.commit()
+            self._touched = {}
+            self.hits = 0
+            self.misses = 0
@@ -4,69 +4,147 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
+import time
+import random
 import asyncio
+from collections import Counter
+from config import EHANCE_DESCRIPTOIN_PROMPT, ENHANCE_REQUESTS_PER_MINUTE, ENHANCE_TOKENS_PER_MINUTE
+from config import ENHANCE_INITIAL_CONCURRENCY, ENHANCE_MAX_CONCURRENCY, ENHANCE_LATENCY_TARGET_SECONDS
+from config import ENHANCE_MAX_RETRIES, ENHANCE_MODEL, ENHANCE_CACHE_PATH
 from config.google_gemini import GeminiClient
 from config.groq_client import GroqClient
+from utils.async_pool import run_blocking
+from utils.enhancement_cache import EnhancementCache
+from utils.rate_limiter import AdaptiveConcurrency, RateLimiter, RateLimitError
+from utils.registry_store import get_registry_store
 
 
-BATCH_SIZE = 15
-DELAY_SECONDS = 30
+# Tokens/min pacing: ~4 characters per token for the prompt, plus room for the response
+SYSTEM_PROMPT_TOKENS = len(EHANCE_DESCRIPTOIN_PROMPT) // 4
+RESPONSE_TOKENS = 400
 
-async def enhance_mcp_description_gemini(old_description: str):
+
+def estimate_tokens(description: str) -> int:
+    return SYSTEM_PROMPT_TOKENS + len(description) // 4 + RESPONSE_TOKENS
+
+async def enhance_mcp_description_gemini(old_description: str, client: GeminiClient = None):
     try:
-        update_description = await GeminiClient().generate_content(contents=old_description)
+        update_description = await (client or GeminiClient()).generate_content(contents=old_description)
         return update_description
+    except RateLimitError:
+        # Not a failed description: the caller backs off and retries it
+        raise
     except Exception as error:
         print(f"When running enhance_mcp_description_gemini we got this error: {error}")
         return old_description  # fallback to original if error
 
-async def enhance_mcp_description_groq(old_description: str):
+async def enhance_mcp_description_groq(old_description: str, client: GroqClient = None):
     try:
-        update_description = await GroqClient().generate_content(contents=old_description)
+        update_description = await (client or GroqClient()).generate_content(contents=old_description)
         print(update_description)
         return update_description
+    except RateLimitError:
+        raise
     except Exception as error:
         print(f"When running enhance_mcp_description_groq we got this error: {error}")
         return old_description
 
-async def enhance_mcp_description():
-    # Load JSON data
-    with open('all_mcp_server.json', 'r', encoding='utf-16') as file:
-        data = json.load(file)
-
-    updated_descriptions = []
-    idx = 0
-
-    descriptions_to_update = [item['description'] for item in data if 'description' in item]
-
-    for i in range(0, len(descriptions_to_update), BATCH_SIZE):
-        batch = descriptions_to_update[i:i+BATCH_SIZE]
+def _parse_description(result) -> str:
+    # Gemini returns the parsed JSON, Groq the JSON text; the original-text fallback raises here
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result['description']
+
+
+async def enhance_mcp_description(max_concurrency: int = ENHANCE_MAX_CONCURRENCY):
+    """
+    Enhance every stored description as fast as the provider quota allows.
+
+    One Gemini client is shared by all requests. Each request first takes a
+    slot from the AIMD concurrency limit, then its share of the
+    requests/min and tokens/min buckets. A 429 halves the concurrency,
+    empties the request bucket and retries the record after a backoff.
+
+    Results go to the enhancement cache before the record is updated, so a
+    rerun (or a resumed crash) skips descriptions this prompt and model
+    already enhanced and reuses results for inputs it has seen. Cache and
+    store calls run on the shared thread pool, so a SQLite write never
+    stalls the requests in flight or their latency samples.
+    """
+    store = get_registry_store()
+    client = GeminiClient(model=ENHANCE_MODEL)
+    cache = EnhancementCache(ENHANCE_CACHE_PATH, model=ENHANCE_MODEL)
+    limiter = RateLimiter(ENHANCE_REQUESTS_PER_MINUTE, ENHANCE_TOKENS_PER_MINUTE)
+    concurrency = AdaptiveConcurrency(
+        initial=min(ENHANCE_INITIAL_CONCURRENCY, max_concurrency),
+        maximum=max_concurrency,
+        latency_target=ENHANCE_LATENCY_TARGET_SECONDS
+    )
+    # Records stream from the registry store and each enhanced description is saved on its own row
+    records = (record for record in store.iter_records() if record.description)
+    counts = Counter()
+
+    async def enhance(record):
+        if await run_blocking(cache.is_enhanced, record.description):
+            counts['already_enhanced'] += 1
+            return
+        cached = await run_blocking(cache.get, record.description)
+        if cached is not None:
+            # Enhanced before (e.g. the run stopped before this record was saved, or it was re-scraped unchanged)
+            await run_blocking(store.update, record.link, {'description': cached})
+            counts['from_cache'] += 1
+            return
+
+        for attempt in range(ENHANCE_MAX_RETRIES + 1):
+            async with concurrency.slot():
+                await limiter.acquire(estimate_tokens(record.description))
+                started = time.perf_counter()
+                try:
+                    # enhance_mcp_description_groq(record.description) --> Alternative GROQ API
+                    result = await enhance_mcp_description_gemini(record.description, client)
+                except RateLimitError as error:
+                    counts['throttled'] += 1
+                    concurrency.on_throttle()
+                    limiter.throttled()
+                    # The provider's Retry-After when it sends one, else jittered exponential backoff
+                    delay = error.retry_after
+                    if delay is None:
+                        delay = random.uniform(0.5, 1.0) * min(60, 2 ** attempt)
+                else:
+                    concurrency.on_success(time.perf_counter() - started)
+                    try:
+                        description = _parse_description(result)
+                        await run_blocking(cache.put, record.description, description)
+                        await run_blocking(store.update, record.link, {'description': description})
+                        counts['updated'] += 1
+                    except (TypeError, ValueError, KeyError) as error:
+                        # The fallback returns the original text, not JSON: keep the record as it is
+                        print(f"Keeping the original description of {record.link}: {error}")
+                        counts['kept'] += 1
+                    return
+            if attempt == ENHANCE_MAX_RETRIES:
+                # Out of retries: no point waiting for a request that will not be sent
+                break
+            # Back off outside the slot, so the remaining slots keep working
+            await asyncio.sleep(delay)
+        print(f"Giving up on {record.link} after {ENHANCE_MAX_RETRIES} rate-limited retries")
+        counts['failed'] += 1
+
+    async def worker():
+        # Workers share one record stream; the concurrency limit decides how many run at once
+        for record in records:
+            await enhance(record)
 
-        # enhance_mcp_description_groq(item['description']) --> Alternative GROQ API
-        tasks = [enhance_mcp_description_gemini(desc) for desc in batch]
-        results = await asyncio.gather(*tasks)
-
-        updated_descriptions.extend(results)
-
-        if i + BATCH_SIZE < len(descriptions_to_update):
-            print(f"⏳ Sleeping for {DELAY_SECONDS} seconds after batch {i//BATCH_SIZE + 1}")
-            await asyncio.sleep(DELAY_SECONDS)
-
-    # Update descriptions in the original data
-    for item in data:
-        if 'description' in item:
-            updated = json.loads(updated_descriptions[idx])
-            item['description'] = updated['description']
-            idx += 1
-
-    # Save updated data
-    with open('all_mcp_server.json', 'w', encoding='utf-16') as file:
-        json.dump(data, file, ensure_ascii=False, indent=2)
+    try:
+        await asyncio.gather(*(worker() for _ in range(max_concurrency)))
+    finally:
+        store.close()
+        cache.close()
 
-    print(f"\n✅ Successfully updated and saved {idx} descriptions.")
+    print(f"\n✅ Successfully updated and saved {counts['updated']} descriptions.")
+    print({**counts, **concurrency.stats(), "rate_limit_wait_s": round(limiter.wait_seconds, 1)})
 
 if __name__ == "__main__":
-    import time
     start = time.time()
     asyncio.run(enhance_mcp_description())
     print("Total Time Taken to completed: ", time.time() - start)
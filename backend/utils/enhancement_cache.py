@@ -0,0 +1,81 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Optional
+from config import EHANCE_DESCRIPTOIN_PROMPT, DescriptionModel
+
+
+def prompt_version(prompt: str = EHANCE_DESCRIPTOIN_PROMPT, schema: dict = None) -> str:
+    # Editing the prompt or the response schema is a new version, without anyone bumping a number
+    schema = schema or DescriptionModel.model_json_schema()
+    return hashlib.sha256(f"{prompt}\n{json.dumps(schema, sort_keys=True)}".encode('utf-8')).hexdigest()[:16]
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EnhancementCache:
+    """
+    Enhanced descriptions keyed by (prompt version, model, sha256 of the input).
+
+    Each result is committed as soon as the provider returns it, so a
+    crashed run loses at most the requests in flight. A description whose
+    hash is a known input gets its result without an API call; one whose
+    hash is a known output was already enhanced by this prompt and model
+    and is skipped.
+    """
+
+    def __init__(self, cache_path: str, model: str, version: Optional[str] = None):
+        self.model = model
+        self.version = version or prompt_version()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS enhancements ("
+            "prompt_version TEXT NOT NULL, model TEXT NOT NULL, input_hash TEXT NOT NULL, "
+            "output TEXT NOT NULL, output_hash TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (prompt_version, model, input_hash))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS enhancements_output ON enhancements (prompt_version, model, output_hash)"
+        )
+        self._connection.commit()
+
+    def get(self, description: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT output FROM enhancements WHERE prompt_version = ? AND model = ? AND input_hash = ?",
+                (self.version, self.model, _hash(description))
+            ).fetchone()
+            # Counted under the lock: lookups come from worker threads
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def is_enhanced(self, description: str) -> bool:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM enhancements WHERE prompt_version = ? AND model = ? AND output_hash = ?",
+                (self.version, self.model, _hash(description))
+            ).fetchone() is not None
+
+    def put(self, description: str, enhanced: str):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO enhancements "
+                "(prompt_version, model, input_hash, output, output_hash, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.version, self.model, _hash(description), enhanced, _hash(enhanced), time.time())
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
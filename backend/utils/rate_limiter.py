@@ -0,0 +1,146 @@
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+# A provider asking for a longer pause than this is retried sooner, and throttled again if it must be
+MAX_RETRY_AFTER_SECONDS = 60
+
+
+def retry_after_seconds(value) -> float:
+    """Seconds to wait from a Retry-After header (delay-seconds or an HTTP date), None when absent or unreadable."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), MAX_RETRY_AFTER_SECONDS)
+
+
+class RateLimitError(Exception):
+    """The provider answered 429: the caller should slow down and retry."""
+
+    def __init__(self, message: str = "rate limited", retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_error(cls, error: Exception) -> "RateLimitError":
+        # Gemini's APIError and Groq's RateLimitError both keep the HTTP response, and with it Retry-After
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        return cls(str(error), retry_after=retry_after_seconds(headers.get('Retry-After') or headers.get('retry-after')))
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units a minute and holds at most `burst_seconds` worth.
+
+    `acquire(amount)` waits until the bucket holds `amount` units, so callers
+    spend quota as fast as it accrues and never faster. A small burst keeps
+    any sliding minute close to the quota, where a full minute's burst
+    could spend it twice.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        # A request larger than the whole bucket would wait forever; let it through on a full bucket
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        if self._lock is None:
+            # Created lazily so the lock belongs to the running loop
+            self._lock = asyncio.Lock()
+        # Callers queue on the lock, so quota is handed out first come, first served
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return time.monotonic() - started
+
+    def drain(self):
+        # After a 429 the provider's own window is spent, whatever our estimate says
+        self._refill()
+        self.tokens = 0.0
+
+
+class RateLimiter:
+    """Requests/min and tokens/min quotas of one provider, as two token buckets."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.wait_seconds = 0.0
+
+    async def acquire(self, tokens: int):
+        self.wait_seconds += await self.requests.acquire(1)
+        self.wait_seconds += await self.tokens.acquire(tokens)
+
+    def throttled(self):
+        self.requests.drain()
+
+
+class AdaptiveConcurrency:
+    """
+    In-flight request limit tuned by AIMD.
+
+    Every success below `latency_target` seconds widens the limit by
+    1/limit (about one more slot per round of requests); a 429 halves it
+    and a slow success narrows it by 10%, never below `minimum` or above
+    `maximum`. Callers hold a slot with `async with concurrency.slot()`.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, latency_target: float = 10.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self.peak = initial
+        self.throttles = 0
+        self._condition = None
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._condition is None:
+            # Created lazily so the condition belongs to the running loop
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            # Waiters re-check against the limit as it stands after this request's outcome
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            self.limit = max(self.minimum, self.limit * 0.9)
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        self.peak = max(self.peak, int(self.limit))
+
+    def on_throttle(self):
+        self.throttles += 1
+        self.limit = max(self.minimum, self.limit / 2)
+
+    def stats(self) -> dict:
+        return {"concurrency": round(self.limit, 2), "peak_concurrency": self.peak, "throttles": self.throttles}
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import argparse
+import threading
+from typing import Iterable, Iterator, Optional, Set
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import REGISTRY_STORE_PATH, LEGACY_RECORDS_PATHS
+from utils.server_record import McpServerRecord
+
+# Bumped when stored records change shape; older rows are re-normalized on open
+SCHEMA_VERSION = 1
+
+
+class RegistryStore:
+    """
+    SQLite store of scraped MCP server records, keyed by link.
+
+    Each `McpServerRecord` is compact UTF-8 JSON, zlib-compressed, in a row
+    indexed by its link, so one server is looked up or updated in place without
+    touching the rest. Reads stream in insertion order over a memory-mapped
+    file, a page of rows at a time. Links the scraper gave up on for good
+    (e.g. a 404) are kept apart, so an interrupted crawl can resume.
+    """
+
+    def __init__(self, path: str = REGISTRY_STORE_PATH, mmap_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Every record is committed on its own; WAL with NORMAL sync keeps that cheap and crash-safe
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "link TEXT PRIMARY KEY, record BLOB NOT NULL, scraped_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS skipped (link TEXT PRIMARY KEY, status INTEGER, skipped_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+        self._migrate()
+
+    def _migrate(self):
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Rows written before the record model hold raw scraper dicts ("1.2k" stars, None categories)
+            rows = self._connection.execute("SELECT link, record FROM records").fetchall()
+            for link, blob in rows:
+                record = McpServerRecord.from_raw(json.loads(zlib.decompress(blob).decode('utf-8')))
+                self._connection.execute(
+                    "UPDATE OR REPLACE records SET link = ?, record = ? WHERE link = ?",
+                    (record.link, self._encode(record), link)
+                )
+        self._connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        self._connection.commit()
+
+    @staticmethod
+    def _encode(record: McpServerRecord) -> bytes:
+        return zlib.compress(json.dumps(record.to_dict(), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def _decode(blob: bytes) -> McpServerRecord:
+        return McpServerRecord.from_dict(json.loads(zlib.decompress(blob).decode('utf-8')))
+
+    def put(self, record: McpServerRecord):
+        self.put_many([record])
+
+    def put_many(self, records: Iterable[McpServerRecord]) -> int:
+        now = time.time()
+        rows = [(record.link, self._encode(record), now, now) for record in records]
+        with self._lock:
+            # Upsert keeps the row (and its place in iteration order) of a link scraped before
+            self._connection.executemany(
+                "INSERT INTO records (link, record, scraped_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(link) DO UPDATE SET record = excluded.record, updated_at = excluded.updated_at",
+                rows
+            )
+            # A page that was gone and came back is no longer skipped
+            self._connection.executemany("DELETE FROM skipped WHERE link = ?", [(row[0],) for row in rows])
+            self._connection.commit()
+        return len(rows)
+
+    def get(self, link: str) -> Optional[McpServerRecord]:
+        with self._lock:
+            row = self._connection.execute("SELECT record FROM records WHERE link = ?", (link,)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def update(self, link: str, fields: dict) -> bool:
+        """Merge `fields` into one stored record. Returns False when the link is unknown."""
+        with self._lock:
+            row = self._connection.execute("SELECT record FROM records WHERE link = ?", (link,)).fetchone()
+            if row is None:
+                return False
+            record = self._decode(row[0]).replace(**fields)
+            self._connection.execute(
+                "UPDATE records SET record = ?, updated_at = ? WHERE link = ?",
+                (self._encode(record), time.time(), link)
+            )
+            self._connection.commit()
+        return True
+
+    def iter_records(self, page_size: int = 256) -> Iterator[McpServerRecord]:
+        # Keyset pages instead of one open cursor, so callers may update records while iterating
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT rowid, record FROM records WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for rowid, blob in rows:
+                yield self._decode(blob)
+            last_rowid = rows[-1][0]
+
+    def skip(self, link: str, status: Optional[int] = None):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO skipped (link, status, skipped_at) VALUES (?, ?, ?)",
+                (link, status, time.time())
+            )
+            self._connection.commit()
+
+    def completed_links(self) -> Set[str]:
+        """Links a resumed crawl does not need to visit again: stored or skipped for good."""
+        with self._lock:
+            links = {row[0] for row in self._connection.execute("SELECT link FROM records")}
+            links.update(row[0] for row in self._connection.execute("SELECT link FROM skipped"))
+        return links
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM records")
+            self._connection.execute("DELETE FROM skipped")
+            self._connection.commit()
+
+    def __contains__(self, link: str) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM records WHERE link = ?", (link,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def read_export(path: str) -> Iterator[dict]:
+    """Records from a JSON array (the old UTF-16 export or UTF-8) or a JSONL file."""
+    with open(path, 'rb') as file:
+        head = file.read(4)
+    # The original scraper wrote UTF-16 with a BOM
+    encoding = 'utf-16' if head[:2] in (b'\xff\xfe', b'\xfe\xff') else 'utf-8-sig'
+    with open(path, 'r', encoding=encoding) as file:
+        first = file.read(1)
+        while first.isspace():
+            first = file.read(1)
+        file.seek(0)
+        if first == '[':
+            yield from json.load(file)
+            return
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                # Only an interrupted write can leave a partial line behind
+                print(f"Skipping unreadable line {number} in {path}: {error}")
+
+
+def import_records(store: RegistryStore, path: str, batch_size: int = 500) -> int:
+    imported = 0
+    batch = []
+    for item in read_export(path):
+        if not item.get('link'):
+            continue
+        # Exports hold raw scraper output: normalized here, once
+        batch.append(McpServerRecord.from_raw(item))
+        if len(batch) >= batch_size:
+            imported += store.put_many(batch)
+            batch = []
+    imported += store.put_many(batch)
+    return imported
+
+
+def export_records(store: RegistryStore, path: str) -> int:
+    exported = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        for record in store.iter_records():
+            file.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            exported += 1
+    return exported
+
+
+def get_registry_store(path: str = REGISTRY_STORE_PATH) -> RegistryStore:
+    """Open the store for readers, importing a legacy JSON/JSONL export the first time it is empty."""
+    if not os.path.exists(path) and not any(os.path.exists(legacy_path) for legacy_path in LEGACY_RECORDS_PATHS):
+        raise FileNotFoundError(f"No registry store at {path}, run the scraper or import an export first")
+    store = RegistryStore(path)
+    if len(store) == 0:
+        for legacy_path in LEGACY_RECORDS_PATHS:
+            if os.path.exists(legacy_path):
+                print(f"Registry store {path} is empty, importing {legacy_path}")
+                print(f"Imported {import_records(store, legacy_path)} records")
+                break
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import or export the scraped MCP server registry")
+    parser.add_argument('command', choices=['import', 'export', 'count'])
+    parser.add_argument('path', nargs='?', default=LEGACY_RECORDS_PATHS[-1],
+                        help='JSON/JSONL file to import, or JSONL file to export to')
+    parser.add_argument('--store', default=REGISTRY_STORE_PATH)
+    args = parser.parse_args()
+
+    registry = RegistryStore(args.store)
+    try:
+        if args.command == 'import':
+            print(f"Imported {import_records(registry, args.path)} records from {args.path} into {args.store}")
+        elif args.command == 'export':
+            print(f"Exported {export_records(registry, args.path)} records from {args.store} to {args.path}")
+        else:
+            print(f"{len(registry)} records in {args.store}")
+    finally:
+        registry.close()
@@ -0,0 +1,150 @@
+import sys
+import uuid
+from typing import Iterable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from langchain_core.documents import Document
+
+
+def parse_stars(value) -> int:
+    # The scraper stores stars as text: "616", "1,234", "1.2k", "3M"
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value or '').strip().lower().replace(',', '')
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return 0
+
+
+def canonical_link(link: Optional[str]) -> str:
+    # Lower-case scheme and host, no fragment or trailing slash: one spelling per page
+    link = (link or '').strip()
+    parts = urlsplit(link)
+    if not parts.netloc:
+        return link
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+
+def document_id(item: dict) -> str:
+    # Stable across scrapes: derived from the registry page link, falling back to the GitHub repo
+    link = item.get('link') or item.get('github_link') or item.get('title') or ''
+    parts = urlsplit(link.strip())
+    canonical = f"{parts.netloc.lower()}{parts.path.rstrip('/')}" if parts.netloc else link.strip().lower()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, canonical))
+
+
+def _text(value) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def _categories(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    if isinstance(values, str):
+        values = [values]
+    # Interned, so the few hundred distinct tags are shared by every record that carries them
+    return tuple(dict.fromkeys(sys.intern(value.strip()) for value in values or () if value and value.strip()))
+
+
+class McpServerRecord:
+    """
+    One scraped MCP server, normalized once at ingest.
+
+    `from_raw` turns scraper or legacy-export dicts into a record: integer
+    stars, categories as a de-duplicated tuple, interned category and
+    language strings, and a canonical link. Every later stage (store,
+    enhancement, document loading) takes the fields as they are. Slots keep
+    a loaded registry to a few machine words per record.
+    """
+
+    __slots__ = ("title", "link", "created_by", "description", "stars", "categories", "language", "github_link")
+
+    def __init__(self, title: str, link: str, created_by: str = '', description: str = '', stars: int = 0,
+                categories: Tuple[str, ...] = (), language: str = '', github_link: str = ''):
+        self.title = title
+        self.link = link
+        self.created_by = created_by
+        self.description = description
+        self.stars = stars
+        self.categories = categories
+        self.language = language
+        self.github_link = github_link
+
+    @classmethod
+    def from_raw(cls, item: dict) -> "McpServerRecord":
+        return cls(
+            title=_text(item.get('title')),
+            link=canonical_link(item.get('link')),
+            created_by=_text(item.get('created_by')),
+            description=item.get('description') or '',
+            stars=parse_stars(item.get('stars')),
+            categories=_categories(item.get('categories')),
+            language=sys.intern(_text(item.get('language'))),
+            github_link=_text(item.get('github_link')),
+        )
+
+    @classmethod
+    def from_dict(cls, item: dict) -> "McpServerRecord":
+        # Already normalized (e.g. read back from the registry store): no parsing, only interning
+        return cls(
+            item['title'], item['link'], item['created_by'], item['description'], item['stars'],
+            tuple(sys.intern(category) for category in item['categories']), sys.intern(item['language']),
+            item['github_link'],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "link": self.link,
+            "created_by": self.created_by,
+            "description": self.description,
+            "stars": self.stars,
+            "categories": list(self.categories),
+            "language": self.language,
+            "github_link": self.github_link,
+        }
+
+    def replace(self, **fields) -> "McpServerRecord":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(fields)
+        return McpServerRecord(**values)
+
+    @property
+    def id(self) -> str:
+        return document_id({"link": self.link, "github_link": self.github_link, "title": self.title})
+
+    def metadata(self) -> dict:
+        return {
+            "title": self.title,
+            "link": self.link,
+            "created_by": self.created_by,
+            "stars": self.stars,
+            "categories": list(self.categories),
+            "language": self.language,
+            "github_link": self.github_link,
+        }
+
+    def to_document(self) -> Document:
+        return Document(id=self.id, page_content=self.description, metadata=self.metadata())
+
+    @classmethod
+    def from_document(cls, document: Document) -> "McpServerRecord":
+        metadata = document.metadata
+        return cls(
+            metadata.get('title', ''), metadata.get('link', ''), metadata.get('created_by', ''),
+            document.page_content, metadata.get('stars', 0), tuple(metadata.get('categories', ())),
+            metadata.get('language', ''), metadata.get('github_link', ''),
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, McpServerRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self) -> int:
+        # Equal records share their canonical link, so records can be set members and dict keys
+        return hash(self.link)
+
+    def __repr__(self) -> str:
+        return f"McpServerRecord(title={self.title!r}, link={self.link!r}, stars={self.stars})"
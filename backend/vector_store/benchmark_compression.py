@@ -0,0 +1,106 @@
+import os
+import time
+import argparse
+import numpy as np
+from vector_store.config import LOCAL_INDEX_PATH
+from vector_store.quantization import CompressedIndex
+
+
+CONFIGURATIONS = [
+    {"name": "float32", "pca_dims": 0, "quantize": False},
+    {"name": "int8", "pca_dims": 0, "quantize": True},
+    {"name": "pca256", "pca_dims": 256, "quantize": False},
+    {"name": "pca128", "pca_dims": 128, "quantize": False},
+    {"name": "pca256+int8", "pca_dims": 256, "quantize": True},
+    {"name": "pca128+int8", "pca_dims": 128, "quantize": True},
+]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+def load_embeddings(index_name: str, size: int, dims: int, seed: int) -> np.ndarray:
+    path = os.path.join(LOCAL_INDEX_PATH, index_name, "embeddings.npy")
+    if os.path.exists(path):
+        print(f"Using embeddings from {path}")
+        return np.load(path, mmap_mode="r")
+    # Clustered synthetic vectors behave more like real text embeddings than pure noise
+    print(f"No local index at {path}, using {size} synthetic {dims}-dim vectors")
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(size // 50, 1), dims))
+    matrix = centers[rng.integers(0, len(centers), size)] + 0.6 * rng.normal(size=(size, dims))
+    return _normalize(matrix)
+
+
+def exact_top_k(matrix: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def run_benchmark(matrix: np.ndarray, queries: np.ndarray, k: int, rerank_factor: int):
+    truth = [set(exact_top_k(matrix, query, k).tolist()) for query in queries]
+    rows = []
+    for configuration in CONFIGURATIONS:
+        if configuration["pca_dims"] >= matrix.shape[1]:
+            continue
+        build_started = time.perf_counter()
+        index = CompressedIndex(
+            matrix,
+            pca_dims=configuration["pca_dims"],
+            quantize=configuration["quantize"],
+            rerank_factor=rerank_factor
+        )
+        build_seconds = time.perf_counter() - build_started
+
+        recalls, latencies = [], []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            found = index.search(query, k)
+            latencies.append(time.perf_counter() - started)
+            recalls.append(len(expected & {row for row, _ in found}) / k)
+
+        rows.append({
+            "name": configuration["name"],
+            "recall": float(np.mean(recalls)),
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p99_ms": float(np.percentile(latencies, 99) * 1000),
+            "memory_mb": index.nbytes / 1024 / 1024,
+            "build_s": build_seconds,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall, latency and memory of compressed local indexes")
+    parser.add_argument('--index-name', default='mcp-server', help='Local index to benchmark, if it exists')
+    parser.add_argument('--size', type=int, default=5000, help='Synthetic vectors when no local index exists')
+    parser.add_argument('--dims', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--rerank-factor', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    matrix = load_embeddings(args.index_name, args.size, args.dims, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    # Queries are perturbed copies of stored rows, close to how user queries land near documents
+    picks = rng.integers(0, len(matrix), args.queries)
+    queries = _normalize(np.asarray(matrix[picks]) + 0.3 * rng.normal(size=(args.queries, matrix.shape[1])) / np.sqrt(matrix.shape[1]))
+    k = min(args.k, len(matrix))
+
+    rows = run_benchmark(matrix, queries, k, args.rerank_factor)
+    print(f"\n{len(matrix)} vectors x {matrix.shape[1]} dims, {len(queries)} queries, recall@{k}, re-rank x{args.rerank_factor}")
+    print(f"{'config':<14}{'recall':>8}{'p50 ms':>10}{'p99 ms':>10}{'memory MB':>12}{'build s':>10}")
+    for row in rows:
+        print(
+            f"{row['name']:<14}{row['recall']:>8.3f}{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+            f"{row['memory_mb']:>12.2f}{row['build_s']:>10.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
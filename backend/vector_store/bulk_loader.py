@@ -0,0 +1,165 @@
+import json
+import time
+import random
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, List, Optional
+from langchain.schema import Document
+
+
+class BulkLoader:
+    """
+    Pipelined embed + upsert loader for large document sets.
+
+    Embedding of batch N+1 runs while batch N is being upserted, upserts
+    run on a bounded thread pool, and the batch size adapts to the payload
+    limit and to observed upsert latency. Failed steps are retried with
+    exponential backoff; a batch that keeps failing is reported instead of
+    aborting the whole run.
+    """
+
+    def __init__(self,
+                embeddings,
+                upsert: Callable[[List[str], List[List[float]], List[dict], List[str]], None],
+                batch_size: int = 50,
+                min_batch_size: int = 5,
+                max_batch_size: int = 200,
+                max_payload_bytes: int = 2 * 1024 * 1024,
+                target_latency: float = 2.0,
+                max_concurrent_upserts: int = 4,
+                max_retries: int = 4,
+                backoff_base: float = 1.0,
+                dimension: int = 768):
+        self.embeddings = embeddings
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.max_payload_bytes = max_payload_bytes
+        self.target_latency = target_latency
+        self.max_concurrent_upserts = max_concurrent_upserts
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.dimension = dimension
+        self._lock = threading.Lock()
+
+    def _payload_bytes(self, document: Document) -> int:
+        # Upsert body is roughly text + metadata + a JSON-encoded float vector
+        return (
+            len(document.page_content.encode('utf-8'))
+            + len(json.dumps(document.metadata, ensure_ascii=False).encode('utf-8'))
+            + self.dimension * 12
+        )
+
+    def _next_batch(self, documents: List[Document], start: int) -> List[Document]:
+        with self._lock:
+            limit = self.batch_size
+        batch, payload = [], 0
+        for document in documents[start:start + limit]:
+            size = self._payload_bytes(document)
+            if batch and payload + size > self.max_payload_bytes:
+                break
+            batch.append(document)
+            payload += size
+        return batch
+
+    def _adapt(self, latency: float):
+        with self._lock:
+            if latency > self.target_latency:
+                self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            elif latency < self.target_latency / 2:
+                self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5) + 1)
+
+    def _retry(self, step: str, function, *args):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return function(*args)
+            except Exception as error:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_base * (2 ** attempt) * (0.5 + random.random())
+                print(f"⚠️ BulkLoader {step} failed ({error}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _embed(self, batch: List[Document]):
+        started = time.perf_counter()
+        vectors = self._retry("embedding", self.embeddings.embed_documents, [doc.page_content for doc in batch])
+        return vectors, time.perf_counter() - started
+
+    def _upsert(self, number: int, batch: List[Document], vectors, embed_seconds: float):
+        started = time.perf_counter()
+        self._retry(
+            "upsert",
+            self.upsert,
+            [doc.page_content for doc in batch],
+            vectors,
+            [doc.metadata for doc in batch],
+            [doc.id or str(uuid.uuid4()) for doc in batch]
+        )
+        upsert_seconds = time.perf_counter() - started
+        self._adapt(upsert_seconds)
+        print(
+            f"Batch {number}: {len(batch)} docs, embed {embed_seconds:.2f}s, "
+            f"upsert {upsert_seconds:.2f}s, {len(batch) / max(upsert_seconds, 1e-9):.1f} docs/s"
+        )
+        return batch
+
+    def load(self, documents: List[Document], on_batch: Optional[Callable[[List[Document]], None]] = None):
+        started = time.perf_counter()
+        upserted, failed_ids, batches = 0, [], 0
+
+        def finish(future, batch):
+            nonlocal upserted
+            try:
+                future.result()
+                upserted += len(batch)
+                if on_batch:
+                    on_batch(batch)
+            except Exception as error:
+                print(f"❌ Batch of {len(batch)} docs failed after {self.max_retries} retries: {error}")
+                failed_ids.extend(doc.id for doc in batch)
+
+        with ThreadPoolExecutor(max_workers=1) as embed_pool, \
+                ThreadPoolExecutor(max_workers=self.max_concurrent_upserts) as upsert_pool:
+            position = 0
+            batch = self._next_batch(documents, position)
+            embed_future = embed_pool.submit(self._embed, batch) if batch else None
+            pending = {}
+
+            while batch:
+                position += len(batch)
+                try:
+                    vectors, embed_seconds = embed_future.result()
+                except Exception as error:
+                    print(f"❌ Embedding {len(batch)} docs failed after {self.max_retries} retries: {error}")
+                    failed_ids.extend(doc.id for doc in batch)
+                    vectors = None
+
+                # Start embedding the next batch before this one is uploaded
+                next_batch = self._next_batch(documents, position)
+                embed_future = embed_pool.submit(self._embed, next_batch) if next_batch else None
+
+                if vectors is not None:
+                    while len(pending) >= self.max_concurrent_upserts:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(future, pending.pop(future))
+                    batches += 1
+                    pending[upsert_pool.submit(self._upsert, batches, batch, vectors, embed_seconds)] = batch
+                batch = next_batch
+
+            for future in list(pending):
+                finish(future, pending.pop(future))
+
+        seconds = time.perf_counter() - started
+        stats = {
+            "documents": len(documents),
+            "upserted": upserted,
+            "failed_ids": failed_ids,
+            "batches": batches,
+            "seconds": round(seconds, 2),
+            "docs_per_second": round(upserted / seconds, 1) if seconds else 0.0,
+        }
+        print(f"BulkLoader finished: {upserted}/{len(documents)} docs in {seconds:.1f}s ({stats['docs_per_second']} docs/s)")
+        return stats
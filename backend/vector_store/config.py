@@ -5,6 +5,37 @@ from pinecone import Pinecone, ServerlessSpec
 
 pinecone_api_key = os.getenv('PINECONE_API_KEY')
 
+# "pinecone" talks to the managed index, "local" serves queries from an in-process matrix
+VECTOR_STORE_BACKEND = os.getenv('VECTOR_STORE_BACKEND', 'pinecone').lower()
+LOCAL_INDEX_PATH = os.getenv('LOCAL_INDEX_PATH', 'local_index')
+LOCAL_INDEX_MMAP = os.getenv('LOCAL_INDEX_MMAP', 'true').lower() == 'true'
+# Optional compression of the local index: int8 codes and/or PCA truncation, re-ranked on float vectors
+LOCAL_INDEX_QUANTIZE = os.getenv('LOCAL_INDEX_QUANTIZE', 'false').lower() == 'true'
+LOCAL_INDEX_PCA_DIMS = int(os.getenv('LOCAL_INDEX_PCA_DIMS', '0'))
+LOCAL_INDEX_RERANK_FACTOR = int(os.getenv('LOCAL_INDEX_RERANK_FACTOR', '4'))
+# Touched after every ingest so query caches in other processes notice the index changed
+INDEX_VERSION_FILE = os.getenv('INDEX_VERSION_FILE', 'index_version')
+# Content-hash manifests used by incremental sync, one per index
+SYNC_MANIFEST_DIR = os.getenv('SYNC_MANIFEST_DIR', 'ingest_manifests')
+# Bulk loader: parallel upsert requests and the per-request payload ceiling (Pinecone caps at 2MB)
+BULK_UPSERT_CONCURRENCY = int(os.getenv('BULK_UPSERT_CONCURRENCY', '4'))
+BULK_MAX_PAYLOAD_BYTES = int(os.getenv('BULK_MAX_PAYLOAD_BYTES', str(2 * 1024 * 1024)))
+# Hybrid retrieval: fuse BM25 hits with vector hits, exact title matches skip the LLM and embedding
+HYBRID_SEARCH_ENABLED = os.getenv('HYBRID_SEARCH_ENABLED', 'true').lower() == 'true'
+LEXICAL_TOP_K = int(os.getenv('LEXICAL_TOP_K', '10'))
+
+
+def get_index_version():
+    try:
+        return os.stat(INDEX_VERSION_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def mark_index_updated():
+    with open(INDEX_VERSION_FILE, 'w') as file:
+        file.write(str(time.time()))
+
 
 def create_pinecone_index(index_name:str):
     try:
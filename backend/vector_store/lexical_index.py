@@ -0,0 +1,145 @@
+import re
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from langchain.schema import Document
+from vector_store.config import get_index_version
+from vector_store._load_documents import create_vector_store_document
+
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+# Words nearly every title carries, ignored when matching a query against a title
+GENERIC_TITLE_TOKENS = {"mcp", "server", "servers", "model", "context", "protocol"}
+FIELD_WEIGHTS = {"title": 3.0, "categories": 2.0, "description": 1.0}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+def title_key(text: str) -> Tuple[str, ...]:
+    tokens = tuple(token for token in tokenize(text) if token not in GENERIC_TITLE_TOKENS)
+    return tokens or tuple(tokenize(text))
+
+
+def _stars(document: Document) -> float:
+    stars = document.metadata.get('stars', 0)
+    return stars if isinstance(stars, (int, float)) else 0
+
+
+def document_key(document: Document) -> str:
+    return document.metadata.get('link') or document.id or document.page_content
+
+
+class BM25Index:
+    """
+    In-memory inverted index with BM25 scoring over title, categories and description.
+
+    Field weights scale term frequencies, so a hit in the title counts
+    more than the same word deep inside the scraped markdown.
+    """
+
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75,
+                field_weights: Dict[str, float] = FIELD_WEIGHTS):
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+        self.titles = defaultdict(list)
+
+        for position, document in enumerate(documents):
+            frequencies = Counter()
+            fields = {
+                "title": document.metadata.get('title', '') or '',
+                "categories": " ".join(document.metadata.get('categories', []) or []),
+                "description": document.page_content or '',
+            }
+            for field, text in fields.items():
+                for token in tokenize(text):
+                    frequencies[token] += field_weights.get(field, 1.0)
+            for token, frequency in frequencies.items():
+                self.postings[token].append((position, frequency))
+            self.doc_lengths.append(sum(frequencies.values()))
+            key = title_key(fields["title"])
+            if key:
+                self.titles[key].append(position)
+
+        self.average_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+        total = len(documents)
+        self.idf = {
+            token: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for token, postings in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.documents)
+
+    def exact_match(self, query: str) -> List[Document]:
+        # "cursor-rust-tools" or "Prisma MCP server" name one server directly, no embedding needed
+        positions = self.titles.get(title_key(query), [])
+        documents = [self.documents[position] for position in positions]
+        return sorted(documents, key=_stars, reverse=True)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[Document, float]]:
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for position, frequency in self.postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[position] / self.average_length)
+                scores[position] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[position], score) for position, score in ranked]
+
+
+def fused_scores(result_lists: List[List[Document]], k: int = 60) -> List[Tuple[Document, float]]:
+    """Fuse ranked lists by summing 1 / (k + rank); documents are matched by registry link."""
+    scores = defaultdict(float)
+    documents = {}
+    for results in result_lists:
+        for rank, document in enumerate(results, start=1):
+            key = document_key(document)
+            scores[key] += 1.0 / (k + rank)
+            documents.setdefault(key, document)
+    return [(documents[key], score) for key, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Document]], k: int = 60) -> List[Document]:
+    return [document for document, _ in fused_scores(result_lists, k=k)]
+
+
+_lexical_index: Optional[BM25Index] = None
+_lexical_version = None
+_lexical_lock = threading.Lock()
+
+
+def get_lexical_index(vectorstore=None) -> Optional[BM25Index]:
+    """
+    Process-wide BM25 index, rebuilt whenever the vector index is re-ingested.
+
+    Documents come from the local vector store when it holds them, otherwise
+    from the registry store. Returns None when neither is available, in
+    which case callers fall back to vector search alone.
+    """
+    global _lexical_index, _lexical_version
+    index_version = get_index_version()
+    with _lexical_lock:
+        if _lexical_version == index_version:
+            return _lexical_index
+        try:
+            if vectorstore is not None and hasattr(vectorstore, 'metadatas') and len(vectorstore):
+                documents = [
+                    Document(id=_id, page_content=text, metadata=metadata)
+                    for _id, text, metadata in zip(vectorstore.ids, vectorstore.texts, vectorstore.metadatas)
+                ]
+            else:
+                documents = create_vector_store_document()
+            _lexical_index = BM25Index(documents)
+            _lexical_version = index_version
+        except Exception as error:
+            print(f"Lexical index unavailable, using vector search only get_lexical_index(): {error}")
+            _lexical_index, _lexical_version = None, index_version
+        return _lexical_index
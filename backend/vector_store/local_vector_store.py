@@ -0,0 +1,433 @@
+import os
+import json
+import uuid
+import threading
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain.schema import Document
+from config.google_gemini import LangchainGeminiClient
+from vector_store.config import LOCAL_INDEX_PATH, LOCAL_INDEX_MMAP, mark_index_updated
+from vector_store.config import LOCAL_INDEX_QUANTIZE, LOCAL_INDEX_PCA_DIMS, LOCAL_INDEX_RERANK_FACTOR
+from vector_store.metadata_index import MetadataIndex
+from vector_store.mmr import maximal_marginal_relevance
+from vector_store.quantization import CompressedIndex
+from vector_store.sync_documents import sync_documents, record_documents
+from vector_store.bulk_loader import BulkLoader
+from utils.async_pool import run_blocking
+
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.json"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store holding a contiguous float32 embedding matrix.
+
+    Rows are L2-normalized on insert so a cosine top-k query is a single
+    matrix-vector product. Texts, ids and metadata live in parallel lists
+    indexed by row. Filters use the same dict syntax as Pinecone so the
+    self-query translator works against both backends.
+
+    With `quantize` and/or `pca_dims` set, candidates are scored on a
+    compressed copy and only the shortlist is re-ranked on the float rows.
+    """
+
+    def __init__(self,
+                embedding: Embeddings,
+                index_path: Optional[str] = None,
+                mmap: bool = True,
+                quantize: bool = False,
+                pca_dims: int = 0,
+                rerank_factor: int = 4):
+        self.embedding = embedding
+        self.index_path = index_path
+        self.quantize = quantize
+        self.pca_dims = pca_dims
+        self.rerank_factor = rerank_factor
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[dict] = []
+        self._id_to_row = {}
+        self._invalidate()
+
+        if index_path and os.path.exists(os.path.join(index_path, EMBEDDINGS_FILE)):
+            self.load(index_path, mmap=mmap)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def __len__(self):
+        return len(self.ids)
+
+    def load(self, index_path: str, mmap: bool = True):
+        self.matrix = np.load(
+            os.path.join(index_path, EMBEDDINGS_FILE),
+            mmap_mode="r" if mmap else None
+        )
+        with open(os.path.join(index_path, RECORDS_FILE), 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        self.ids = [record["id"] for record in records]
+        self.texts = [record["text"] for record in records]
+        self.metadatas = [record["metadata"] for record in records]
+        self._id_to_row = {_id: row for row, _id in enumerate(self.ids)}
+        self._invalidate()
+
+    def save(self, index_path: Optional[str] = None):
+        index_path = index_path or self.index_path
+        os.makedirs(index_path, exist_ok=True)
+        # Write to temp files first so a reader never maps a half-written matrix.
+        embeddings_tmp = os.path.join(index_path, EMBEDDINGS_FILE + ".tmp")
+        records_tmp = os.path.join(index_path, RECORDS_FILE + ".tmp")
+        with open(embeddings_tmp, 'wb') as file:
+            np.save(file, np.ascontiguousarray(self.matrix, dtype=np.float32))
+        with open(records_tmp, 'w', encoding='utf-8') as file:
+            json.dump(
+                [
+                    {"id": _id, "text": text, "metadata": metadata}
+                    for _id, text, metadata in zip(self.ids, self.texts, self.metadatas)
+                ],
+                file,
+                ensure_ascii=False
+            )
+        os.replace(embeddings_tmp, os.path.join(index_path, EMBEDDINGS_FILE))
+        os.replace(records_tmp, os.path.join(index_path, RECORDS_FILE))
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+        # Existing ids are overwritten in place, new ids are appended as new rows.
+        matrix = np.array(self.matrix, dtype=np.float32) if len(self.ids) else \
+            np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        new_rows = []
+        for position, (_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+            row = self._id_to_row.get(_id)
+            if row is not None and row >= len(matrix):
+                # Same id repeated inside this batch: the later copy wins.
+                new_rows[row - len(matrix)] = position
+                self.texts[row] = text
+                self.metadatas[row] = metadata
+            elif row is None:
+                self._id_to_row[_id] = len(self.ids)
+                self.ids.append(_id)
+                self.texts.append(text)
+                self.metadatas.append(metadata)
+                new_rows.append(position)
+            else:
+                matrix[row] = vectors[position]
+                self.texts[row] = text
+                self.metadatas[row] = metadata
+        if new_rows:
+            matrix = np.vstack([matrix, vectors[new_rows]])
+        self.matrix = matrix
+        self._invalidate()
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        embeddings = self.embedding.embed_documents(texts)
+        return self.add_embeddings(texts, embeddings, metadatas=metadatas, ids=ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        remove = {self._id_to_row[_id] for _id in ids if _id in self._id_to_row}
+        if not remove:
+            return False
+        keep = [row for row in range(len(self.ids)) if row not in remove]
+        self.matrix = np.array(self.matrix[keep], dtype=np.float32)
+        self.ids = [self.ids[row] for row in keep]
+        self.texts = [self.texts[row] for row in keep]
+        self.metadatas = [self.metadatas[row] for row in keep]
+        self._id_to_row = {_id: row for row, _id in enumerate(self.ids)}
+        self._invalidate()
+        return True
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        return [self._document(self._id_to_row[_id]) for _id in ids if _id in self._id_to_row]
+
+    def _document(self, row: int) -> Document:
+        return Document(id=self.ids[row], page_content=self.texts[row], metadata=self.metadatas[row])
+
+    def _invalidate(self):
+        self._metadata_index = None
+        self._compressed_index = None
+
+    @property
+    def compressed_index(self) -> Optional[CompressedIndex]:
+        if not (self.quantize or self.pca_dims) or not len(self.ids):
+            return None
+        if self._compressed_index is None:
+            self._compressed_index = CompressedIndex(
+                self.matrix,
+                pca_dims=self.pca_dims,
+                quantize=self.quantize,
+                rerank_factor=self.rerank_factor
+            )
+        return self._compressed_index
+
+    @property
+    def metadata_index(self) -> MetadataIndex:
+        # Built on first filtered query after any write, then reused
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(self.metadatas)
+        return self._metadata_index
+
+    def _candidate_rows(self, filter: Optional[dict]) -> Optional[np.ndarray]:
+        return self.metadata_index.candidates(filter)
+
+    def _top_k(self, embedding: List[float], k: int, filter: Optional[dict]) -> List[Tuple[int, float]]:
+        if not len(self.ids):
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm:
+            query = query / query_norm
+
+        candidates = self._candidate_rows(filter)
+        if candidates is not None and not len(candidates):
+            return []
+        if self.compressed_index is not None:
+            return self.compressed_index.search(query, k, rows=candidates)
+        if candidates is None:
+            scores = self.matrix @ query
+            rows = np.arange(len(scores))
+        else:
+            scores = self.matrix[candidates] @ query
+            rows = candidates
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return [(self._document(row), score) for row, score in self._top_k(embedding, k, filter)]
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k=k, filter=filter)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        embedding = self.embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_score(embedding, k=k, filter=filter)
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def candidates_by_vector(
+        self, embedding: List[float], fetch_k: int = 20, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, np.ndarray]]:
+        # MMR candidates with their stored vectors, for callers that diversify a pool of their own
+        return [(self._document(row), self.matrix[row]) for row, _ in self._top_k(embedding, fetch_k, filter)]
+
+    def vectors_by_ids(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        return {_id: self.matrix[self._id_to_row[_id]] for _id in ids if _id in self._id_to_row}
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        candidates = self.candidates_by_vector(embedding, fetch_k=fetch_k, filter=filter)
+        if not candidates:
+            return []
+        selected = maximal_marginal_relevance(
+            embedding, [vector for _, vector in candidates], k=k, lambda_mult=lambda_mult
+        )
+        return [candidates[i][0] for i in selected]
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        embedding = self.embedding.embed_query(query)
+        return self.max_marginal_relevance_search_by_vector(
+            embedding, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+        )
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        return await run_blocking(self.similarity_search_by_vector, embedding, k=k, filter=filter)
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Document]:
+        # Only the embedding call is I/O; the matrix scan runs on the bounded pool
+        embedding = await self.embedding.aembed_query(query)
+        return await self.asimilarity_search_by_vector(embedding, k=k, filter=filter)
+
+    async def acandidates_by_vector(
+        self, embedding: List[float], fetch_k: int = 20, filter: Optional[dict] = None, **kwargs: Any
+    ) -> List[Tuple[Document, np.ndarray]]:
+        return await run_blocking(self.candidates_by_vector, embedding, fetch_k=fetch_k, filter=filter)
+
+    async def avectors_by_ids(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        return self.vectors_by_ids(ids)
+
+    async def amax_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        return await run_blocking(
+            self.max_marginal_relevance_search_by_vector,
+            embedding, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+        )
+
+    async def amax_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        embedding = await self.embedding.aembed_query(query)
+        return await self.amax_marginal_relevance_search_by_vector(
+            embedding, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+        )
+
+    def _select_relevance_score_fn(self):
+        # Rows and queries are unit vectors, so the score is cosine similarity in [-1, 1].
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        index_path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding=embedding, index_path=index_path)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+
+class LocalVectorStoreManage:
+
+    def __init__(self,
+                index_name='mcp-server',
+                embeddings=None,
+                index_path=LOCAL_INDEX_PATH,
+                mmap=LOCAL_INDEX_MMAP,
+                quantize=LOCAL_INDEX_QUANTIZE,
+                pca_dims=LOCAL_INDEX_PCA_DIMS):
+
+        if embeddings is None:
+            # Built here, not as a default argument, so importing the module (e.g. for Pinecone) opens nothing
+            embeddings = LangchainGeminiClient().generate_embeddings()
+        self.index_path = os.path.join(index_path, index_name)
+        self.manifest_path = os.path.join(self.index_path, "manifest.json")
+        self.vectorstore = LocalVectorStore(
+            embedding=embeddings,
+            index_path=self.index_path,
+            mmap=mmap,
+            quantize=quantize,
+            pca_dims=pca_dims,
+            rerank_factor=LOCAL_INDEX_RERANK_FACTOR
+        )
+        self._write_lock = threading.Lock()
+
+    def upsert_embeddings(self, texts: List[str], vectors: List[List[float]], metadatas: List[dict], ids: List[str]):
+        with self._write_lock:
+            self.vectorstore.add_embeddings(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def bulk_upsert(self, documents: List[Document], batch_size: int = 50, on_batch=None):
+        # Upserts are in-memory, so only embedding benefits from the pipeline
+        loader = BulkLoader(
+            self.vectorstore.embeddings,
+            self.upsert_embeddings,
+            batch_size=batch_size,
+            max_concurrent_upserts=1
+        )
+        return loader.load(documents, on_batch=on_batch)
+
+    def create_documents(self, documents: List[Document], batch_size: int = 50):
+        try:
+            loaded = []
+            stats = self.bulk_upsert(documents, batch_size=batch_size, on_batch=loaded.extend)
+
+            self.vectorstore.save(self.index_path)
+            record_documents(self.manifest_path, loaded)
+            mark_index_updated()
+            print(f"Documents added: {stats['upserted']}/{stats['documents']}, failed: {len(stats['failed_ids'])}")
+            return self.vectorstore
+        except Exception as error:
+            print(f"An error occurred while creating documents at LocalVectorStoreManage().create_documents(): {error}")
+
+    def sync_documents(self, documents: List[Document], batch_size: int = 50):
+        try:
+            stats = sync_documents(
+                self,
+                documents,
+                batch_size=batch_size,
+                persist=lambda: self.vectorstore.save(self.index_path)
+            )
+            print(f"Documents synced: {stats}")
+            return stats
+        except Exception as error:
+            print(f"An error occurred while syncing documents at LocalVectorStoreManage().sync_documents(): {error}")
+
+    def retrieve_query(self, _query:str, k:int=1, fetch_k:int=20, lambda_mult:float=0.5):
+        try:
+            if k > 1:
+                retreive = self.vectorstore.max_marginal_relevance_search(
+                    _query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+                )
+                return [document.page_content for document in retreive]
+            retreive = self.vectorstore.similarity_search(_query, k=1)
+            return retreive[0].page_content
+        except Exception as error:
+            print(f"An error occurred while creating documents at LocalVectorStoreManage().retrieve_query(): {error}")
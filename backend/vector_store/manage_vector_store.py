@@ -1,9 +1,114 @@
 import os
 from langchain_pinecone import PineconeVectorStore
-from vector_store.config import create_pinecone_index
+from vector_store.config import create_pinecone_index, mark_index_updated, VECTOR_STORE_BACKEND, SYNC_MANIFEST_DIR
+from vector_store.config import BULK_UPSERT_CONCURRENCY, BULK_MAX_PAYLOAD_BYTES
+from vector_store.bulk_loader import BulkLoader
+from vector_store.local_vector_store import LocalVectorStoreManage
+from vector_store.sync_documents import sync_documents, record_documents
 from config.google_gemini import LangchainGeminiClient
 from langchain.schema import Document
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from vector_store.mmr import maximal_marginal_relevance
+
+
+TEXT_KEY = "text"
+
+
+class MMRPineconeVectorStore(PineconeVectorStore):
+    # Same query as langchain's MMR search, but diversified with the incremental NumPy MMR
+    def candidates_by_vector(
+        self,
+        embedding: List[float],
+        fetch_k: int = 20,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> List[Tuple[Document, List[float]]]:
+        results = self.index.query(
+            vector=embedding,
+            top_k=fetch_k,
+            include_values=True,
+            include_metadata=True,
+            namespace=namespace or self._namespace,
+            filter=filter,
+        )
+        return self._candidates(results["matches"])
+
+    async def acandidates_by_vector(
+        self,
+        embedding: List[float],
+        fetch_k: int = 20,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> List[Tuple[Document, List[float]]]:
+        async with self._async_index_context() as index:
+            results = await index.query(
+                vector=embedding,
+                top_k=fetch_k,
+                include_values=True,
+                include_metadata=True,
+                namespace=namespace or self._namespace,
+                filter=filter,
+            )
+        return self._candidates(results["matches"])
+
+    def vectors_by_ids(self, ids: List[str]) -> Dict[str, List[float]]:
+        if not ids:
+            return {}
+        response = self.index.fetch(ids=list(ids), namespace=self._namespace)
+        return {_id: vector.values for _id, vector in response.vectors.items()}
+
+    async def avectors_by_ids(self, ids: List[str]) -> Dict[str, List[float]]:
+        if not ids:
+            return {}
+        async with self._async_index_context() as index:
+            response = await index.fetch(ids=list(ids), namespace=self._namespace)
+        return {_id: vector.values for _id, vector in response.vectors.items()}
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> List[Document]:
+        candidates = self.candidates_by_vector(embedding, fetch_k=fetch_k, filter=filter, namespace=namespace)
+        return self._select_mmr(embedding, candidates, k, lambda_mult)
+
+    async def amax_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs,
+    ) -> List[Document]:
+        candidates = await self.acandidates_by_vector(embedding, fetch_k=fetch_k, filter=filter, namespace=namespace)
+        return self._select_mmr(embedding, candidates, k, lambda_mult)
+
+    @staticmethod
+    def _candidates(matches: list) -> List[Tuple[Document, List[float]]]:
+        candidates = []
+        for match in matches:
+            metadata = dict(match["metadata"])
+            document = Document(id=match["id"], page_content=metadata.pop(TEXT_KEY, ""), metadata=metadata)
+            candidates.append((document, match["values"]))
+        return candidates
+
+    @staticmethod
+    def _select_mmr(embedding: List[float], candidates: list, k: int, lambda_mult: float) -> List[Document]:
+        if not candidates:
+            return []
+        selected = maximal_marginal_relevance(
+            embedding, [vector for _, vector in candidates], k=k, lambda_mult=lambda_mult
+        )
+        return [candidates[i][0] for i in selected]
 
 
 class PineconeVectorStoreManage:
@@ -13,24 +118,63 @@ class PineconeVectorStoreManage:
                 embeddings=LangchainGeminiClient().generate_embeddings()):
 
         self.index = create_pinecone_index(index_name=index_name)
-        self.vectorstore = PineconeVectorStore(index=self.index, embedding=embeddings)
+        self.manifest_path = os.path.join(SYNC_MANIFEST_DIR, f"{index_name}.manifest.json")
+        self.vectorstore = MMRPineconeVectorStore(index=self.index, embedding=embeddings, text_key=TEXT_KEY)
+
+    def upsert_embeddings(self, texts: List[str], vectors: List[List[float]], metadatas: List[dict], ids: List[str]):
+        self.index.upsert(vectors=[
+            {"id": _id, "values": vector, "metadata": {**metadata, TEXT_KEY: text}}
+            for _id, text, vector, metadata in zip(ids, texts, vectors, metadatas)
+        ])
+
+    def bulk_upsert(self, documents: List[Document], batch_size: int = 50, on_batch=None):
+        loader = BulkLoader(
+            self.vectorstore.embeddings,
+            self.upsert_embeddings,
+            batch_size=batch_size,
+            max_payload_bytes=BULK_MAX_PAYLOAD_BYTES,
+            max_concurrent_upserts=BULK_UPSERT_CONCURRENCY
+        )
+        return loader.load(documents, on_batch=on_batch)
 
     def create_documents(self, documents: List[Document], batch_size: int = 50):
         try:
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
-                self.vectorstore.add_documents(batch)
+            loaded = []
+            stats = self.bulk_upsert(documents, batch_size=batch_size, on_batch=loaded.extend)
 
-            print(f"Documents successfully added in batches of {batch_size}")
+            record_documents(self.manifest_path, loaded)
+            mark_index_updated()
+            print(f"Documents added: {stats['upserted']}/{stats['documents']}, failed: {len(stats['failed_ids'])}")
             return self.vectorstore
         except Exception as error:
             print(f"An error occurred while creating documents at PineconeVectorStoreManage().create_documents(): {error}")
 
-    def retrieve_query(self, _query:str):
+    def sync_documents(self, documents: List[Document], batch_size: int = 50):
         try:
-            retreive = self.vectorstore.similarity_search(_query)
+            stats = sync_documents(self, documents, batch_size=batch_size)
+            print(f"Documents synced: {stats}")
+            return stats
+        except Exception as error:
+            print(f"An error occurred while syncing documents at PineconeVectorStoreManage().sync_documents(): {error}")
+
+    def retrieve_query(self, _query:str, k:int=1, fetch_k:int=20, lambda_mult:float=0.5):
+        try:
+            if k > 1:
+                retreive = self.vectorstore.max_marginal_relevance_search(
+                    _query, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+                )
+                return [document.page_content for document in retreive]
+            retreive = self.vectorstore.similarity_search(_query, k=1)
             # print("@@ METADATA ",retreive)
             return retreive[0].page_content
         except Exception as error:
             print(f"An error occurred while creating documents at PineconeVectorStoreManage().retrieve_query(): {error}")
 
+
+def get_vector_store_manage(backend:str=VECTOR_STORE_BACKEND, **kwargs):
+    # Both managers expose the same create_documents / retrieve_query / vectorstore interface
+    if backend == 'local':
+        return LocalVectorStoreManage(**kwargs)
+    if backend == 'pinecone':
+        return PineconeVectorStoreManage(**kwargs)
+    raise ValueError(f"Unknown VECTOR_STORE_BACKEND {backend}, expected 'pinecone' or 'local'")
@@ -0,0 +1,193 @@
+import numpy as np
+from collections import defaultdict
+from typing import Any, List, Optional
+from utils.server_record import parse_stars
+
+
+NEGATIVE_OPERATORS = ("$ne", "$nin")
+
+
+def _match_operator(value: Any, operator: str, expected: Any) -> bool:
+    # List metadata (e.g. categories) matches like Pinecone: any element for
+    # positive operators, every element for negative ones.
+    if isinstance(value, list):
+        if operator in NEGATIVE_OPERATORS:
+            return all(_match_operator(item, operator, expected) for item in value)
+        return any(_match_operator(item, operator, expected) for item in value)
+    try:
+        if operator == "$eq":
+            return value == expected
+        if operator == "$ne":
+            return value != expected
+        if operator == "$gt":
+            return value > expected
+        if operator == "$gte":
+            return value >= expected
+        if operator == "$lt":
+            return value < expected
+        if operator == "$lte":
+            return value <= expected
+        if operator == "$in":
+            return value in expected
+        if operator == "$nin":
+            return value not in expected
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator {operator}")
+
+
+def match_filter(metadata: dict, filter: Optional[dict]) -> bool:
+    """Evaluate a Pinecone-style metadata filter against a single record."""
+    if not filter:
+        return True
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(match_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        elif key == "$or":
+            if not any(match_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        else:
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            if key not in metadata:
+                return False
+            for operator, expected in condition.items():
+                if not _match_operator(metadata[key], operator, expected):
+                    return False
+    return True
+
+
+class MetadataIndex:
+    """
+    Precomputed metadata indexes used to pre-filter rows before vector search.
+
+    - stars: values sorted once, so range filters are two binary searches
+    - categories: one packed bitset per category (posting lists as bits)
+    - language: row ids per language
+
+    A filter is evaluated to a packed bitset with AND/OR/NOT on whole
+    arrays; fields without an index fall back to a per-row scan. As in
+    `match_filter`, a row without the filtered key never matches, not even
+    `$ne` / `$nin`.
+    """
+
+    INDEXED_FIELDS = ("stars", "categories", "language")
+
+    def __init__(self, metadatas: List[dict]):
+        self.metadatas = metadatas
+        self.size = len(metadatas)
+
+        stars = np.array([parse_stars(metadata.get('stars')) for metadata in metadatas], dtype=np.int64)
+        self.stars_order = np.argsort(stars, kind='stable')
+        self.stars_sorted = stars[self.stars_order]
+
+        category_rows = defaultdict(list)
+        language_rows = defaultdict(list)
+        for row, metadata in enumerate(metadatas):
+            for category in metadata.get('categories', []) or []:
+                category_rows[category].append(row)
+            language_rows[metadata.get('language', '') or ''].append(row)
+
+        self.categories = {category: self._bits(rows) for category, rows in category_rows.items()}
+        self.languages = {language: np.array(rows, dtype=np.int64) for language, rows in language_rows.items()}
+        self._all = self._bits(np.arange(self.size))
+        self._none = np.zeros_like(self._all)
+        self._present = {
+            field: self._bits([row for row, metadata in enumerate(metadatas) if field in metadata])
+            for field in self.INDEXED_FIELDS
+        }
+
+    def _bits(self, rows) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[np.asarray(rows, dtype=np.int64)] = True
+        return np.packbits(mask)
+
+    def _not(self, bits: np.ndarray, field: str) -> np.ndarray:
+        # Only rows that have the field, which also keeps the padding bits of the last byte clear
+        return ~bits & self._present[field]
+
+    def _stars(self, operator: str, value) -> np.ndarray:
+        if operator == "$in":
+            return _or([self._stars("$eq", item) for item in value], self._none)
+        if operator == "$nin":
+            return self._not(self._stars("$in", value), "stars")
+        if operator == "$ne":
+            return self._not(self._stars("$eq", value), "stars")
+        # A fractional bound stays fractional: $lt 500.5 keeps 500, $gt 500.5 starts at 501
+        value = value if isinstance(value, (int, float)) else parse_stars(value)
+        left, right = 0, self.size
+        if operator in ("$eq", "$gte"):
+            left = np.searchsorted(self.stars_sorted, value, side='left')
+        if operator == "$gt":
+            left = np.searchsorted(self.stars_sorted, value, side='right')
+        if operator in ("$eq", "$lte"):
+            right = np.searchsorted(self.stars_sorted, value, side='right')
+        if operator == "$lt":
+            right = np.searchsorted(self.stars_sorted, value, side='left')
+        return self._bits(self.stars_order[left:right])
+
+    def _categories(self, operator: str, value) -> np.ndarray:
+        if operator in ("$eq", "$in"):
+            values = value if operator == "$in" else [value]
+            return _or([self.categories.get(item, self._none) for item in values], self._none)
+        if operator in ("$ne", "$nin"):
+            return self._not(self._categories("$in", value if operator == "$nin" else [value]), "categories")
+        return self._scan({"categories": {operator: value}})
+
+    def _language(self, operator: str, value) -> np.ndarray:
+        if operator in ("$eq", "$in"):
+            values = value if operator == "$in" else [value]
+            rows = [self.languages[item] for item in values if item in self.languages]
+            return self._bits(np.concatenate(rows)) if rows else self._none
+        if operator in ("$ne", "$nin"):
+            return self._not(self._language("$in", value if operator == "$nin" else [value]), "language")
+        return self._scan({"language": {operator: value}})
+
+    def _scan(self, filter: dict) -> np.ndarray:
+        return self._bits([row for row, metadata in enumerate(self.metadatas) if match_filter(metadata, filter)])
+
+    def _evaluate(self, filter: dict) -> np.ndarray:
+        result = self._all
+        for key, condition in filter.items():
+            if key == "$and":
+                bits = _and([self._evaluate(sub_filter) for sub_filter in condition], self._all)
+            elif key == "$or":
+                bits = _or([self._evaluate(sub_filter) for sub_filter in condition], self._none)
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                parts = []
+                for operator, value in condition.items():
+                    if key == "stars":
+                        parts.append(self._stars(operator, value))
+                    elif key == "categories":
+                        parts.append(self._categories(operator, value))
+                    elif key == "language":
+                        parts.append(self._language(operator, value))
+                    else:
+                        parts.append(self._scan({key: {operator: value}}))
+                bits = _and(parts, self._present.get(key, self._all))
+            result = result & bits
+        return result
+
+    def candidates(self, filter: Optional[dict]) -> Optional[np.ndarray]:
+        """Row ids matching `filter`, or None when there is nothing to filter on."""
+        if not filter:
+            return None
+        bits = self._evaluate(filter)
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+
+def _and(parts, default):
+    result = default
+    for bits in parts:
+        result = result & bits
+    return result
+
+
+def _or(parts, default):
+    result = default
+    for bits in parts:
+        result = result | bits
+    return result
@@ -20,7 +20,7 @@ metadata_filed_info = [
     AttributeInfo(
         name="stars",
         description="The number of GitHub stars the project has received, reflecting its popularity or credibility.",
-        type="string"
+        type="integer"
     ),
     AttributeInfo(
         name="categories",
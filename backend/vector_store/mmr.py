@@ -0,0 +1,43 @@
+import numpy as np
+from typing import List, Optional, Sequence
+
+
+def maximal_marginal_relevance(query_embedding, embeddings, k: int = 4, lambda_mult: float = 0.5,
+                            relevance: Optional[Sequence[float]] = None, selected: Sequence[int] = ()) -> List[int]:
+    """
+    Pick `k` diverse rows out of already-fetched candidate embeddings.
+
+    Each step scores every candidate at once as
+    lambda * sim(query) - (1 - lambda) * max sim(selected) and keeps the
+    running max similarity to the selected set as one vector, so a step
+    costs a single matrix-vector product instead of recomputing the full
+    pairwise similarity matrix.
+
+    `relevance` replaces the query similarity with the caller's own scores
+    (e.g. fused vector and lexical ranks), scaled to at most 1; the query
+    embedding is then not needed. `selected` rows are kept first, in order,
+    and the rest are picked for diversity against them.
+    """
+    candidates = np.asarray(embeddings, dtype=np.float32)
+    if k <= 0 or not len(candidates):
+        return []
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    candidates = candidates / norms
+    if relevance is None:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        relevance = candidates @ query
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+        relevance = relevance / (np.abs(relevance).max() or 1.0)
+
+    selected = list(selected)[:k] or [int(np.argmax(relevance))]
+    max_similarity = np.max(candidates[selected] @ candidates.T, axis=0)
+    while len(selected) < min(k, len(candidates)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(max_similarity, candidates @ candidates[best], out=max_similarity)
+    return selected
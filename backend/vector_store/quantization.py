@@ -0,0 +1,86 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+class PCAProjection:
+    """Project unit vectors onto their top principal components."""
+
+    def __init__(self, dims: int):
+        self.dims = dims
+        self.mean = None
+        self.components = None
+
+    def fit(self, matrix: np.ndarray, sample_size: int = 20000) -> "PCAProjection":
+        sample = np.asarray(matrix[:sample_size], dtype=np.float32)
+        self.mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+        self.components = np.ascontiguousarray(vt[:self.dims].T, dtype=np.float32)
+        return self
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        # Centering shifts every score by the same amount per query, so it is skipped for queries
+        return np.asarray(vectors, dtype=np.float32) @ self.components
+
+
+class Int8Quantizer:
+    """Symmetric per-dimension scalar quantization to int8."""
+
+    def __init__(self):
+        self.scale = None
+
+    def fit(self, matrix: np.ndarray) -> "Int8Quantizer":
+        max_abs = np.abs(np.asarray(matrix, dtype=np.float32)).max(axis=0)
+        max_abs[max_abs == 0] = 1.0
+        self.scale = (max_abs / 127.0).astype(np.float32)
+        return self
+
+    def encode(self, matrix: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(matrix / self.scale), -127, 127).astype(np.int8)
+
+
+class CompressedIndex:
+    """
+    Compressed copy of a float32 embedding matrix for candidate generation.
+
+    Vectors are optionally PCA-truncated to `pca_dims` and/or int8
+    quantized. A query scores every compressed row, keeps the best
+    `k * rerank_factor` candidates, then re-ranks only those rows with the
+    exact float vectors, which stay memory-mapped on disk.
+    """
+
+    def __init__(self, matrix: np.ndarray, pca_dims: int = 0, quantize: bool = True, rerank_factor: int = 4):
+        self.matrix = matrix
+        self.rerank_factor = rerank_factor
+        self.pca = PCAProjection(pca_dims).fit(matrix) if pca_dims and pca_dims < matrix.shape[1] else None
+        reduced = self.pca.transform(matrix) if self.pca else np.asarray(matrix, dtype=np.float32)
+        self.quantizer = Int8Quantizer().fit(reduced) if quantize else None
+        self.codes = self.quantizer.encode(reduced) if self.quantizer else np.ascontiguousarray(reduced)
+
+    @property
+    def nbytes(self) -> int:
+        extra = self.pca.components.nbytes if self.pca else 0
+        return self.codes.nbytes + extra
+
+    def _approximate_scores(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        projected = self.pca.transform(query) if self.pca else query
+        if self.quantizer:
+            # codes * scale @ q == codes @ (scale * q); fold the scale into the query once
+            projected = projected * self.quantizer.scale
+        codes = self.codes if rows is None else self.codes[rows]
+        return codes @ projected.astype(np.float32)
+
+    def search(self, query: np.ndarray, k: int, rows: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        total = len(self.codes) if rows is None else len(rows)
+        if not total:
+            return []
+        k = min(k, total)
+        approximate = self._approximate_scores(query, rows)
+        shortlist_size = min(total, k * self.rerank_factor)
+        shortlist = np.argpartition(-approximate, shortlist_size - 1)[:shortlist_size]
+        candidates = shortlist if rows is None else rows[shortlist]
+
+        # Sorted rows keep the float re-rank reads sequential on the memory-mapped matrix
+        candidates = np.sort(candidates)
+        exact = np.asarray(self.matrix[candidates], dtype=np.float32) @ query
+        top = np.argsort(-exact)[:k]
+        return [(int(candidates[i]), float(exact[i])) for i in top]
@@ -0,0 +1,99 @@
+import os
+import json
+import hashlib
+from typing import Dict, List
+from langchain.schema import Document
+from vector_store.config import mark_index_updated
+
+
+def content_hash(document: Document) -> str:
+    payload = json.dumps(
+        {"page_content": document.page_content, "metadata": document.metadata},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_manifest(manifest_path: str) -> Dict[str, str]:
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_manifest(manifest_path: str, manifest: Dict[str, str]):
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def record_documents(manifest_path: str, documents: List[Document]):
+    # Full ingests also feed the manifest so the next sync only sees real changes
+    manifest = load_manifest(manifest_path)
+    manifest.update({document.id: content_hash(document) for document in documents if document.id})
+    save_manifest(manifest_path, manifest)
+
+
+def sync_documents(manager, documents: List[Document], batch_size: int = 50, persist=None):
+    """
+    Bring the manager's index in line with `documents` using its content-hash manifest.
+
+    Only new or changed documents are embedded and upserted (through the
+    manager's bulk loader) under their deterministic ids, and ids that
+    disappeared from the scrape are deleted. The manifest is saved after
+    every batch so an interrupted sync resumes where it stopped; `persist`
+    is called first for stores that keep their data in memory until saved.
+    """
+    manifest_path = manager.manifest_path
+    manifest = load_manifest(manifest_path)
+    current = {}
+    for document in documents:
+        if not document.id:
+            raise ValueError(f"Document {document.metadata.get('title')} has no id, build it with create_vector_store_document()")
+        current[document.id] = (document, content_hash(document))
+
+    changed = [document for _id, (document, digest) in current.items() if manifest.get(_id) != digest]
+    added = sum(1 for document in changed if document.id not in manifest)
+    # An empty scrape almost always means the scraper failed, never wipe the index for it
+    removed = [_id for _id in manifest if _id not in current] if current else []
+
+    def checkpoint(batch: List[Document]):
+        if persist:
+            persist()
+        manifest.update({document.id: current[document.id][1] for document in batch})
+        save_manifest(manifest_path, manifest)
+
+    load_stats = manager.bulk_upsert(changed, batch_size=batch_size, on_batch=checkpoint) if changed else {}
+
+    if removed:
+        manager.vectorstore.delete(ids=removed)
+        if persist:
+            persist()
+        for _id in removed:
+            manifest.pop(_id, None)
+        save_manifest(manifest_path, manifest)
+
+    if changed or removed:
+        mark_index_updated()
+
+    return {
+        "added": added,
+        "updated": len(changed) - added,
+        "deleted": len(removed),
+        "unchanged": len(current) - len(changed),
+        # Failed batches stay out of the manifest and are retried on the next sync
+        "failed": len(load_stats.get("failed_ids", [])),
+    }
+
+
+if __name__ == '__main__':
+    from vector_store._load_documents import create_vector_store_document
+    from vector_store.manage_vector_store import get_vector_store_manage
+
+    vector_store = get_vector_store_manage()
+    print(vector_store.sync_documents(create_vector_store_document()))
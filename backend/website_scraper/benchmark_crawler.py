@@ -0,0 +1,276 @@
+import io
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from aiohttp import web
+from website_scraper import mcp_scraper
+from website_scraper.benchmark_extractors import FIXTURES_DIR, load_pages
+from website_scraper.crawler import CrawlStats, Fetcher, create_session
+from website_scraper.parse_pool import ParsePool
+from website_scraper.config import SCRAPER_CONCURRENCY, SCRAPER_PARSE_WORKERS
+
+try:
+    import resource
+except ImportError:
+    # Windows has no getrusage; peak RSS and the parse workers' CPU time are then not reported
+    resource = None
+
+
+TARGETS = ("crawl", "cards")
+
+
+class StubRegistry:
+    """
+    Local stand-in for the registry, so crawls can be timed without the network.
+
+    Serves `listing_pages` numbered listing pages of `cards_per_page` cards in
+    the registry's markup, each linking to a detail page taken round-robin
+    from the saved fixture (or synthetic) pages. Every card's fate is fixed
+    by the seed: a share of detail pages answer slowly, 404, or 429 on their
+    first request, and every response waits `latency_ms`.
+    """
+
+    def __init__(self, pages, listing_pages: int = 20, cards_per_page: int = 24, latency_ms: float = 5,
+                slow_ratio: float = 0.05, slow_ms: float = 500, not_found_ratio: float = 0.02,
+                throttle_ratio: float = 0.05, retry_after: int = 0, seed: int = 7):
+        self.pages = pages
+        self.listing_pages = listing_pages
+        self.cards_per_page = cards_per_page
+        self.latency = latency_ms / 1000
+        self.slow = slow_ms / 1000
+        self.retry_after = retry_after
+        self.hits = Counter()
+        rng = random.Random(seed)
+        self.fates = []
+        for _ in range(listing_pages * cards_per_page):
+            draw = rng.random()
+            if draw < not_found_ratio:
+                self.fates.append("404")
+            elif draw < not_found_ratio + throttle_ratio:
+                self.fates.append("429")
+            elif draw < not_found_ratio + throttle_ratio + slow_ratio:
+                self.fates.append("slow")
+            else:
+                self.fates.append("ok")
+
+    @property
+    def expected_records(self) -> int:
+        # Throttled pages succeed on retry; only the 404s never become records
+        return sum(fate != "404" for fate in self.fates)
+
+    def listing_html(self, page: int) -> str:
+        if page > self.listing_pages:
+            return "<html><body><main></main></body></html>"
+        first = (page - 1) * self.cards_per_page
+        cards = "".join(
+            f'<div class="p-6"><a class="text-xl" href="/servers/stub/{number}">Server {number}</a>'
+            f'<p class="text-sm text-muted-foreground truncate">author-{number % 97}</p>'
+            f'<p class="text-muted-foreground mb-4 line-clamp-2">Stub MCP server number {number}</p>'
+            f'<span class="flex items-center mr-3">{number * 7 % 5000}</span></div>'
+            for number in range(first, first + self.cards_per_page)
+        )
+        next_link = f'<a href="/servers?page={page + 1}">Next</a>' if page < self.listing_pages else ""
+        return f"<html><body><main>{cards}</main><nav>{next_link}</nav></body></html>"
+
+    async def listing(self, request):
+        await asyncio.sleep(self.latency)
+        return web.Response(text=self.listing_html(int(request.query.get("page", 1))), content_type="text/html")
+
+    async def detail(self, request):
+        number = int(request.match_info["number"])
+        if number >= len(self.fates):
+            return web.Response(status=404)
+        self.hits[number] += 1
+        fate = self.fates[number]
+        await asyncio.sleep(self.slow if fate == "slow" else self.latency)
+        if fate == "404":
+            return web.Response(status=404)
+        if fate == "429" and self.hits[number] == 1:
+            return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+        return web.Response(text=self.pages[number % len(self.pages)], content_type="text/html")
+
+    def application(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/servers", self.listing)
+        app.router.add_get("/servers/stub/{number}", self.detail)
+        return app
+
+
+def serve(settings: dict, fixtures: str, synthetic: int, ready):
+    # Runs in its own process, so the crawler's CPU time and RSS are measured alone
+    async def run():
+        with redirect_stdout(io.StringIO()):
+            pages = load_pages(fixtures, synthetic, settings["seed"])
+        runner = web.AppRunner(StubRegistry(pages, **settings).application(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        ready.put(runner.addresses[0][1])
+        await asyncio.Event().wait()
+    asyncio.run(run())
+
+
+async def scrape_cards(base_url: str, registry: StubRegistry, concurrency: int, parse_workers: int) -> CrawlStats:
+    """process_card/McpToolsScraper over every card, without walking the listing pages."""
+    stats = CrawlStats()
+    semaphore = asyncio.Semaphore(concurrency)
+    parse_pool = ParsePool(workers=parse_workers)
+    async with create_session(concurrency=concurrency) as session:
+        fetcher = Fetcher(session, stats)
+
+        async def scrape(number):
+            listing = {
+                "title": f"Server {number}", "link": f"{base_url}/servers/stub/{number}",
+                "created_by": "stub", "description": "", "baseline_stars": "0",
+            }
+            async with semaphore:
+                _, record = await mcp_scraper.process_card(fetcher, listing, parse_pool)
+            if record:
+                stats.records += 1
+
+        stats.cards = len(registry.fates)
+        try:
+            await asyncio.gather(*(scrape(number) for number in range(stats.cards)))
+        finally:
+            parse_pool.close()
+    return stats
+
+
+def cpu_seconds(children: bool = False) -> float:
+    # Children are the parse workers, counted once the pool has shut them down
+    if resource is None:
+        return float("nan") if children else time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss_mb(children: bool = False) -> float:
+    # For children, the largest single worker rather than a sum
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_target(target: str, base_url: str, registry: StubRegistry, concurrency: int, parse_workers: int,
+               verbose: bool) -> dict:
+    """One target in a fresh process, whose only children are its parse workers."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_target, target, base_url, registry, concurrency, parse_workers, verbose).result()
+
+
+def _run_target(target: str, base_url: str, registry: StubRegistry, concurrency: int, parse_workers: int,
+                verbose: bool) -> dict:
+    cpu_started = cpu_seconds()
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory, redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        if target == "crawl":
+            stats = asyncio.run(mcp_scraper.main(
+                use_cache=False, resume=False, store_path=f"{directory}/registry.sqlite",
+                concurrency=concurrency, base_url=base_url, parse_workers=parse_workers
+            ))
+        else:
+            stats = asyncio.run(scrape_cards(base_url, registry, concurrency, parse_workers))
+    seconds = time.perf_counter() - started
+    summary = stats.summary()
+    pages = stats.pages + stats.records
+    return {
+        "target": target,
+        "seconds": round(seconds, 2),
+        "pages": pages,
+        "pages_per_s": round(pages / seconds, 1),
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        # The crawling process and its parse workers apart: with workers, most parsing happens in them
+        "cpu_s": round(cpu_seconds() - cpu_started, 2),
+        "workers_cpu_s": round(cpu_seconds(children=True), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "workers_peak_rss_mb": round(peak_rss_mb(children=True), 1),
+        "records": stats.records,
+        "expected_records": registry.expected_records,
+        "retries": stats.retries,
+        "statuses": summary["statuses"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper throughput against a local stub registry")
+    parser.add_argument('--target', choices=TARGETS + ("all",), default="all",
+                        help='crawl: mcp_scraper.main end to end, cards: process_card on every card')
+    parser.add_argument('--listing-pages', type=int, default=20)
+    parser.add_argument('--cards-per-page', type=int, default=24)
+    parser.add_argument('--latency-ms', type=float, default=5, help='Delay of every stub response')
+    parser.add_argument('--slow-ratio', type=float, default=0.05)
+    parser.add_argument('--slow-ms', type=float, default=500)
+    parser.add_argument('--not-found-ratio', type=float, default=0.02)
+    parser.add_argument('--throttle-ratio', type=float, default=0.05, help='Detail pages that 429 on first request')
+    parser.add_argument('--retry-after', type=int, default=0, help='Retry-After seconds sent with a 429')
+    parser.add_argument('--concurrency', type=int, default=SCRAPER_CONCURRENCY)
+    parser.add_argument('--parse-workers', type=int, default=SCRAPER_PARSE_WORKERS, help='0 parses on the event loop')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Directory of saved detail pages (*.html)')
+    parser.add_argument('--synthetic', type=int, default=50, help='Synthetic pages when --fixtures is empty')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--min-pages-per-s', type=float, default=0, help='Fail below this throughput')
+    parser.add_argument('--max-p99-ms', type=float, default=0, help='Fail above this p99 page latency')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show the crawler output')
+    args = parser.parse_args()
+
+    settings = {
+        "listing_pages": args.listing_pages, "cards_per_page": args.cards_per_page,
+        "latency_ms": args.latency_ms, "slow_ratio": args.slow_ratio, "slow_ms": args.slow_ms,
+        "not_found_ratio": args.not_found_ratio, "throttle_ratio": args.throttle_ratio,
+        "retry_after": args.retry_after, "seed": args.seed,
+    }
+    # Same fates as the server, without its pages, to know how many records to expect
+    registry = StubRegistry([], **settings)
+
+    rows = []
+    for target in (TARGETS if args.target == "all" else (args.target,)):
+        # A fresh server per target, so first-request 429s happen again
+        ready = multiprocessing.Queue()
+        server = multiprocessing.Process(target=serve, args=(settings, args.fixtures, args.synthetic, ready), daemon=True)
+        server.start()
+        try:
+            base_url = f"http://127.0.0.1:{ready.get(timeout=30)}"
+            rows.append(run_target(target, base_url, registry, args.concurrency, args.parse_workers, args.verbose))
+        finally:
+            server.terminate()
+            server.join()
+
+    print(f"\n{len(registry.fates)} cards on {args.listing_pages} listing pages, "
+        f"concurrency {args.concurrency}, {args.parse_workers} parse workers")
+    print(f"{'target':<8}{'pages':>7}{'pages/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'cpu s':>8}{'rss MB':>8}"
+        f"{'worker cpu s':>14}{'worker MB':>11}{'records':>12}")
+    failures = []
+    for row in rows:
+        print(f"{row['target']:<8}{row['pages']:>7}{row['pages_per_s']:>10.1f}{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            f"{row['cpu_s']:>8.2f}{row['peak_rss_mb']:>8.1f}{row['workers_cpu_s']:>14.2f}{row['workers_peak_rss_mb']:>11.1f}"
+            f"{row['records']:>6}/{row['expected_records']:<5}")
+        if row['records'] != row['expected_records']:
+            failures.append(f"{row['target']}: {row['records']} records, expected {row['expected_records']}")
+        if args.min_pages_per_s and row['pages_per_s'] < args.min_pages_per_s:
+            failures.append(f"{row['target']}: {row['pages_per_s']} pages/s is below {args.min_pages_per_s}")
+        if args.max_p99_ms and row['p99_ms'] > args.max_p99_ms:
+            failures.append(f"{row['target']}: p99 {row['p99_ms']} ms is above {args.max_p99_ms}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(rows, file, indent=2)
+    if failures:
+        print("\n".join(["", "Benchmark failed:"] + failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import glob
+import time
+import random
+import asyncio
+import argparse
+from bs4 import BeautifulSoup
+from website_scraper.config import MCP_REGISTRY_BASE_URL
+from website_scraper.crawler import Fetcher, create_session
+from website_scraper.extractors import EXTRACTORS, FIELDS
+
+
+REFERENCE = "soup"
+# Detail pages committed with the code, so parity is checked on pages not built for the extractors
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+WORDS = "server tool model context protocol query database index stream agent client token cache".split()
+
+
+def synthetic_page(rng: random.Random) -> str:
+    # Same structure as a registry detail page: header, stats, category tags and a long README
+    categories = "".join(f"<span>{rng.choice(WORDS)}-{i}</span>" for i in range(rng.randint(1, 6)))
+    paragraphs = "".join(
+        f"<h2>{rng.choice(WORDS).title()}</h2><p>{' '.join(rng.choices(WORDS, k=rng.randint(40, 120)))}</p>"
+        f"<pre><code>{' '.join(rng.choices(WORDS, k=30))}</code></pre>"
+        for _ in range(rng.randint(5, 40))
+    )
+    navigation = "".join(f'<a href="/servers/{i}">Server {i}</a>' for i in range(60))
+    return (
+        f"<html><head><title>MCP</title></head><body><nav>{navigation}</nav><main>"
+        f'<div class="flex flex-wrap gap-2">{categories}</div>'
+        f'<div class="grid"><div class="flex items-center"><h3>Language:</h3><p> Python </p></div>'
+        f'<div class="flex items-center"><h3>Stars:</h3><p> {rng.randint(0, 5000)} </p></div></div>'
+        f'<a href="https://github.com/example/{rng.randint(0, 999)}"><span>View on Github</span></a>'
+        f'<div class="markdown-body">{paragraphs}</div></main></body></html>'
+    )
+
+
+async def save_fixtures(directory: str, count: int):
+    """Download `count` live detail pages from the registry into `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    async with create_session() as session:
+        fetcher = Fetcher(session)
+        status, content = await fetcher.fetch(f"{MCP_REGISTRY_BASE_URL}/servers")
+        if status != 200:
+            raise RuntimeError(f"Listing page returned {status}")
+        links = [
+            tag['href'] for tag in BeautifulSoup(content, "html.parser").find_all("a", class_="text-xl")
+            if tag.get('href')
+        ][:count]
+        for position, link in enumerate(links):
+            status, html = await fetcher.fetch(MCP_REGISTRY_BASE_URL + link)
+            if status == 200:
+                with open(os.path.join(directory, f"detail_{position:04d}.html"), 'w', encoding='utf-8') as file:
+                    file.write(html)
+    print(f"Saved {len(links)} fixture pages to {directory}")
+
+
+def load_pages(directory: str, synthetic: int, seed: int):
+    paths = sorted(glob.glob(os.path.join(directory, "*.html"))) if directory else []
+    if paths:
+        print(f"Using {len(paths)} fixture pages from {directory}")
+        pages = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as file:
+                pages.append(file.read())
+        return pages
+    print(f"No fixture pages found, using {synthetic} synthetic detail pages")
+    rng = random.Random(seed)
+    return [synthetic_page(rng) for _ in range(synthetic)]
+
+
+def run_benchmark(pages, repeat: int):
+    reference_extractor = EXTRACTORS[REFERENCE]()
+    reference = [reference_extractor.extract(page) for page in pages]
+    rows = []
+    for name, factory in EXTRACTORS.items():
+        extractor = factory()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            results = [extractor.extract(page) for page in pages]
+        seconds = time.perf_counter() - started
+        parity = {
+            field: sum(result[field] == expected[field] for result, expected in zip(results, reference)) / len(pages)
+            for field in FIELDS
+        }
+        rows.append({"name": name, "pages_per_s": len(pages) * repeat / seconds, "parity": parity})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed and per-field parity of detail page extractors")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Directory of saved detail pages (*.html)')
+    parser.add_argument('--save-fixtures', type=int, default=0, help='Download this many live pages first')
+    parser.add_argument('--synthetic', type=int, default=200, help='Synthetic pages when --fixtures is empty')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.save_fixtures:
+        asyncio.run(save_fixtures(args.fixtures, args.save_fixtures))
+    pages = load_pages(args.fixtures, args.synthetic, args.seed)
+    rows = run_benchmark(pages, args.repeat)
+
+    print(f"\n{len(pages)} pages x {args.repeat}, parity against the '{REFERENCE}' extractor")
+    print(f"{'extractor':<12}{'pages/s':>10}" + "".join(f"{field:>13}" for field in FIELDS))
+    for row in rows:
+        print(f"{row['name']:<12}{row['pages_per_s']:>10.1f}" + "".join(f"{row['parity'][field]:>13.3f}" for field in FIELDS))
+
+
+if __name__ == '__main__':
+    main()
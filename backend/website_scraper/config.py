@@ -0,0 +1,25 @@
+import os
+
+# Registry to crawl; listing pages live under /servers
+MCP_REGISTRY_BASE_URL = os.getenv('MCP_REGISTRY_BASE_URL', 'https://www.mcpserverfinder.com').rstrip('/')
+# 0 walks every listing page, 1 reproduces the old first-page-only scrape
+SCRAPER_MAX_PAGES = int(os.getenv('SCRAPER_MAX_PAGES', '0'))
+# Cards processed at once across the crawl, and open connections per host
+SCRAPER_CONCURRENCY = int(os.getenv('SCRAPER_CONCURRENCY', '16'))
+SCRAPER_PER_HOST_LIMIT = int(os.getenv('SCRAPER_PER_HOST_LIMIT', '8'))
+SCRAPER_TIMEOUT_SECONDS = float(os.getenv('SCRAPER_TIMEOUT_SECONDS', '15'))
+SCRAPER_DNS_CACHE_SECONDS = int(os.getenv('SCRAPER_DNS_CACHE_SECONDS', '300'))
+# Retries on 429/5xx and connection errors, with jittered exponential backoff
+SCRAPER_MAX_RETRIES = int(os.getenv('SCRAPER_MAX_RETRIES', '4'))
+SCRAPER_BACKOFF_SECONDS = float(os.getenv('SCRAPER_BACKOFF_SECONDS', '0.5'))
+# Validators and bodies from the last crawl, replayed as conditional requests (304 = reuse body)
+SCRAPER_HTTP_CACHE_ENABLED = os.getenv('SCRAPER_HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+SCRAPER_HTTP_CACHE_PATH = os.getenv('SCRAPER_HTTP_CACHE_PATH', 'scraper_http_cache.sqlite')
+# Detail page parser: "lxml" (single pass), "soup-lxml" (BeautifulSoup + SoupStrainer) or "soup" (reference)
+SCRAPER_EXTRACTOR = os.getenv('SCRAPER_EXTRACTOR', 'lxml')
+# Processes that parse HTML off the event loop (0 parses inline), and pages allowed to wait for them.
+# One per core; a single core gains nothing from a worker process but the IPC cost
+_CPUS = os.cpu_count() or 1
+SCRAPER_PARSE_WORKERS = int(os.getenv('SCRAPER_PARSE_WORKERS', str(_CPUS if _CPUS > 1 else 0)))
+SCRAPER_PARSE_QUEUE = int(os.getenv('SCRAPER_PARSE_QUEUE', '0'))
+SCRAPER_USER_AGENT = os.getenv('SCRAPER_USER_AGENT', 'MCP-Registry-Agent/1.0 (+https://mcpserver.cognitodev.space)')
@@ -0,0 +1,185 @@
+import re
+import math
+import time
+import random
+import asyncio
+import aiohttp
+from collections import Counter
+from typing import Optional, Tuple
+from urllib.parse import urljoin, urlsplit, parse_qs, urlencode, urlunsplit
+from website_scraper.config import SCRAPER_CONCURRENCY, SCRAPER_PER_HOST_LIMIT, SCRAPER_TIMEOUT_SECONDS
+from website_scraper.config import SCRAPER_DNS_CACHE_SECONDS, SCRAPER_MAX_RETRIES, SCRAPER_BACKOFF_SECONDS
+from website_scraper.config import SCRAPER_USER_AGENT
+from website_scraper.http_cache import HttpCache
+from utils.rate_limiter import retry_after_seconds
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+NEXT_LABELS = {"next", "next page", "›", "»", "→"}
+
+
+class CrawlStats:
+    """Counters for one crawl, printed as a summary at the end."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.bytes = 0
+        self.pages = 0
+        self.cards = 0
+        self.records = 0
+        self.resumed = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+        self.statuses = Counter()
+        # Seconds per fetch, retries included
+        self.latencies = []
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed or 1e-9
+        return {
+            "elapsed_s": round(self.elapsed, 2),
+            "listing_pages": self.pages,
+            "cards": self.cards,
+            "records": self.records,
+            "resumed": self.resumed,
+            "requests": self.requests,
+            "requests_per_s": round(self.requests / elapsed, 2),
+            "records_per_s": round(self.records / elapsed, 2),
+            "retries": self.retries,
+            "failures": self.failures,
+            "mb_downloaded": round(self.bytes / 1024 / 1024, 2),
+            "not_modified": self.not_modified,
+            "mb_saved_by_cache": round(self.bytes_saved / 1024 / 1024, 2),
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 1),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 1),
+            "statuses": dict(self.statuses),
+        }
+
+
+def percentile(values, q: float) -> float:
+    # Nearest-rank percentile, enough for latency summaries without pulling in numpy
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def create_session(concurrency: int = SCRAPER_CONCURRENCY,
+                per_host_limit: int = SCRAPER_PER_HOST_LIMIT,
+                timeout: float = SCRAPER_TIMEOUT_SECONDS) -> aiohttp.ClientSession:
+    # Pooled keep-alive connections and cached DNS: one TLS handshake per connection, not per request
+    connector = aiohttp.TCPConnector(
+        limit=concurrency,
+        limit_per_host=per_host_limit,
+        ttl_dns_cache=SCRAPER_DNS_CACHE_SECONDS,
+        keepalive_timeout=30,
+        enable_cleanup_closed=True
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={"User-Agent": SCRAPER_USER_AGENT}
+    )
+
+
+class Fetcher:
+    """
+    GETs pages over a shared session with retries.
+
+    429 and 5xx responses and connection errors are retried with jittered
+    exponential backoff, honouring Retry-After when the server sends it.
+    Other statuses are returned as-is for the caller to judge. With an
+    `HttpCache`, requests are conditional and a 304 is returned as a 200
+    with the cached body.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, stats: Optional[CrawlStats] = None,
+                max_retries: int = SCRAPER_MAX_RETRIES, backoff_base: float = SCRAPER_BACKOFF_SECONDS,
+                cache: Optional[HttpCache] = None):
+        self.session = session
+        self.stats = stats or CrawlStats()
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        # Delay-seconds or an HTTP date, capped at MAX_RETRY_AFTER_SECONDS
+        delay = retry_after_seconds(retry_after)
+        if delay is not None:
+            return delay
+        # Full jitter keeps many throttled workers from retrying in lockstep
+        return random.uniform(0, self.backoff_base * 2 ** attempt)
+
+    async def fetch(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        started = time.perf_counter()
+        try:
+            return await self._fetch(url)
+        finally:
+            self.stats.latencies.append(time.perf_counter() - started)
+
+    async def _fetch(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        cached = self.cache.get(url) if self.cache else None
+        headers = self.cache.conditional_headers(cached) if cached else None
+        for attempt in range(self.max_retries + 1):
+            self.stats.requests += 1
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    self.stats.statuses[response.status] += 1
+                    if response.status == 304 and cached:
+                        self.stats.not_modified += 1
+                        self.stats.bytes_saved += len(cached[2])
+                        return 200, cached[2]
+                    if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                        delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                    else:
+                        body = await response.read()
+                        self.stats.bytes += len(body)
+                        if response.status in RETRY_STATUSES:
+                            self.stats.failures += 1
+                        text = body.decode(response.get_encoding() or 'utf-8', errors='replace')
+                        if response.status == 200 and self.cache:
+                            self.cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), text)
+                        return response.status, text
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self.stats.statuses[type(error).__name__] += 1
+                if attempt >= self.max_retries:
+                    self.stats.failures += 1
+                    print(f"Error Fetcher.fetch() URL {url}: {error}")
+                    return None, None
+                delay = self._backoff(attempt)
+            self.stats.retries += 1
+            await asyncio.sleep(delay)
+        return None, None
+
+
+def _is_next_label(text: Optional[str]) -> bool:
+    # Whole labels only: "Next ›" is pagination, "Next.js MCP server" or "Nextcloud" is a card
+    label = " ".join((text or "").casefold().split())
+    return label in NEXT_LABELS or label.strip("›»→ ") in NEXT_LABELS
+
+
+def next_page_url(soup, current_url: str, page: int) -> Optional[str]:
+    """Follow the listing's own "next" link, or guess ?page=N+1 when it links numbered pages."""
+    link = soup.find("a", rel="next")
+    if link is None:
+        for anchor in soup.find_all("a", href=True):
+            if _is_next_label(anchor.get_text(strip=True)) or _is_next_label(anchor.get("aria-label")):
+                link = anchor
+                break
+    if link is not None and link.get("href"):
+        return urljoin(current_url, link["href"])
+
+    numbered = re.compile(rf"[?&]page={page + 1}(?:&|$)")
+    if any(numbered.search(anchor["href"]) for anchor in soup.find_all("a", href=True)):
+        parts = urlsplit(current_url)
+        query = parse_qs(parts.query)
+        query["page"] = [str(page + 1)]
+        return urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+    return None
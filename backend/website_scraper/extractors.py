@@ -0,0 +1,154 @@
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import html as lxml_html
+from website_scraper.config import SCRAPER_EXTRACTOR
+
+
+FIELDS = ("categories", "language", "github_link", "stars", "markdown")
+# Tags inside which BeautifulSoup keeps whitespace-only strings as they are
+PRESERVE_WHITESPACE_TAGS = {"pre", "textarea"}
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+# Defaults when a field is missing, same as the original McpToolsScraper getters
+EMPTY_FIELDS = {"categories": None, "language": None, "github_link": None, "stars": 0, "markdown": ""}
+
+
+class SoupExtractor:
+    """
+    Reference extractor: the original McpToolsScraper lookups, one per field.
+
+    `parse_only` limits parsing to the tags the fields live in
+    (SoupStrainer), and `parser` may be "lxml" instead of the pure-Python
+    "html.parser".
+    """
+
+    def __init__(self, parser: str = "html.parser", parse_only: bool = False):
+        self.parser = parser
+        self.parse_only = SoupStrainer(["div", "h3", "p", "a", "span"]) if parse_only else None
+
+    def extract(self, html: str) -> dict:
+        soup = BeautifulSoup(html, self.parser, parse_only=self.parse_only)
+        fields = dict(EMPTY_FIELDS)
+        try:
+            categories = [tag.text.strip() for tag in soup.select("div.flex.flex-wrap span")]
+            fields["categories"] = categories or None
+        except Exception as error:
+            print(f"When running SoupExtractor categories we got this error {error}")
+            fields["categories"] = []
+        try:
+            find_language = soup.find("h3", string="Language:").find_next_sibling("p")
+            fields["language"] = find_language.text.strip() if find_language is not None else None
+        except Exception as error:
+            print(f"When running SoupExtractor language we got this error {error}")
+        for tag in soup.find_all("a"):
+            if "View on Github" in tag.get_text(strip=True):
+                fields["github_link"] = tag.get("href")
+                break
+        try:
+            for div in soup.find_all('div', class_='flex items-center'):
+                label = div.find('h3')
+                if label and label.text.strip() == 'Stars:':
+                    fields["stars"] = div.find('p').text.strip()
+                    break
+        except Exception as error:
+            print(f"When running SoupExtractor stars we got this error {error}")
+            fields["stars"] = None
+        fields["markdown"] = "".join(
+            div.get_text().strip("\n") for div in soup.find_all('div', class_="markdown-body")
+        )
+        return fields
+
+
+class LxmlExtractor:
+    """
+    Single pass over an lxml tree that fills every field at once.
+
+    lxml parses in C, and each element is visited once: category spans
+    check their ancestors, "Language:"/"Stars:" labels and GitHub links
+    are matched as they are met, and markdown bodies are collected in
+    document order. Text is read the way BeautifulSoup stores it, so the
+    fields match the reference extractor on pretty-printed pages.
+    """
+
+    def extract(self, html: str) -> dict:
+        fields = dict(EMPTY_FIELDS)
+        if not html or not html.strip():
+            return fields
+        root = lxml_html.fromstring(html)
+        categories, markdown = [], []
+        language_found = github_found = stars_found = False
+
+        for element in root.iter("div", "span", "h3", "a"):
+            tag = element.tag
+            if tag == "span":
+                if any(_has_classes(ancestor, "flex", "flex-wrap") for ancestor in element.iterancestors("div")):
+                    categories.append(_soup_text(element).strip())
+            elif tag == "div":
+                classes = (element.get("class") or "").split()
+                if "markdown-body" in classes:
+                    markdown.append(_soup_text(element).strip("\n"))
+                # Matches the exact class attribute, like BeautifulSoup's class_='flex items-center'
+                if not stars_found and element.get("class") == "flex items-center":
+                    label = next(element.iterdescendants("h3"), None)
+                    if label is not None and _soup_text(label).strip() == "Stars:":
+                        value = next(element.iterdescendants("p"), None)
+                        fields["stars"] = _soup_text(value).strip() if value is not None else None
+                        stars_found = True
+            elif tag == "h3":
+                if not language_found and len(element) == 0 and element.text == "Language:":
+                    language_found = True
+                    value = next(element.itersiblings("p"), None)
+                    fields["language"] = _soup_text(value).strip() if value is not None else None
+            elif not github_found and "View on Github" in "".join(text.strip() for text in element.itertext()):
+                fields["github_link"] = element.get("href")
+                github_found = True
+
+        fields["categories"] = categories or None
+        fields["markdown"] = "".join(markdown)
+        return fields
+
+
+def _soup_whitespace(text, preserve: bool) -> str:
+    # BeautifulSoup stores a string of ASCII spaces as one newline (or one space if it has none)
+    if not text or preserve or text.strip(ASCII_SPACES):
+        return text or ""
+    return "\n" if "\n" in text else " "
+
+
+def _soup_text(element, preserve: bool = False) -> str:
+    """`get_text()` of the same element in BeautifulSoup: comments left out, whitespace-only strings collapsed."""
+    preserve = preserve or element.tag in PRESERVE_WHITESPACE_TAGS
+    parts = [_soup_whitespace(element.text, preserve)]
+    for child in element:
+        if isinstance(child.tag, str):
+            parts.append(_soup_text(child, preserve))
+        # A comment's tail is text of the parent, like any child's
+        parts.append(_soup_whitespace(child.tail, preserve))
+    return "".join(parts)
+
+
+def _has_classes(element, *names) -> bool:
+    classes = (element.get("class") or "").split()
+    return all(name in classes for name in names)
+
+
+EXTRACTORS = {
+    "soup": lambda: SoupExtractor(),
+    "soup-lxml": lambda: SoupExtractor(parser="lxml", parse_only=True),
+    "lxml": lambda: LxmlExtractor(),
+}
+
+
+def get_extractor(name: str = SCRAPER_EXTRACTOR):
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor {name}, expected one of {sorted(EXTRACTORS)}")
+    return EXTRACTORS[name]()
+
+
+# One extractor per parse pool process, built on first use
+_worker_extractors = {}
+
+
+def extract_fields(name: str, html: str) -> dict:
+    """Module-level entry point for parse pool workers: raw HTML in, plain field dict out."""
+    if name not in _worker_extractors:
+        _worker_extractors[name] = get_extractor(name)
+    return _worker_extractors[name].extract(html)
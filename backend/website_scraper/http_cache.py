@@ -0,0 +1,61 @@
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+
+class HttpCache:
+    """
+    On-disk store of validators and bodies for conditional re-crawls.
+
+    Each 200 response that carries an ETag or Last-Modified header is kept
+    (body zlib-compressed) keyed by URL. The next crawl sends
+    If-None-Match / If-Modified-Since and a 304 is answered from disk, so an
+    unchanged page costs headers instead of its full body.
+    """
+
+    def __init__(self, cache_path: str):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body = row
+        return etag, last_modified, zlib.decompress(body).decode('utf-8')
+
+    def conditional_headers(self, entry) -> dict:
+        headers = {}
+        if entry:
+            etag, last_modified, _ = entry
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str):
+        if not etag and not last_modified:
+            # Without a validator the server cannot answer 304, so there is nothing to gain
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, zlib.compress(body.encode('utf-8')), time.time())
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,84 +1,186 @@
 import asyncio
-import aiohttp
+import argparse
+from concurrent.futures import BrokenExecutor
 from bs4 import BeautifulSoup
-import json
+from config import REGISTRY_STORE_PATH
+from utils.registry_store import RegistryStore
+from utils.server_record import McpServerRecord, canonical_link
 from website_scraper.tools_scraper import McpToolsScraper
+from website_scraper.crawler import CrawlStats, Fetcher, create_session, next_page_url
+from website_scraper.http_cache import HttpCache
+from website_scraper.parse_pool import ParsePool
+from website_scraper.config import MCP_REGISTRY_BASE_URL, SCRAPER_MAX_PAGES, SCRAPER_CONCURRENCY
+from website_scraper.config import SCRAPER_HTTP_CACHE_ENABLED, SCRAPER_HTTP_CACHE_PATH, SCRAPER_PARSE_WORKERS
 
 
-async def validate_link(session, url):
-    try:
-        async with session.get(url) as response:
-            return response.status == 200
-    except:
-        return False
-
-
-async def process_card(session, card):
+def parse_card(card, base_url: str = MCP_REGISTRY_BASE_URL):
+    # Only the card's text is kept, so the listing page's soup can be freed right away
     try:
         title_tag = card.find("a", class_="text-xl")
-        title = title_tag.text.strip()
-        link = "https://www.mcpserverfinder.com" + title_tag['href']
+        stats = card.find_all("span", class_="flex items-center mr-3")
+        return {
+            "title": title_tag.text.strip(),
+            # Same spelling as the stored record, so resumed crawls recognize finished links
+            "link": canonical_link(base_url + title_tag['href']),
+            "created_by": card.find("p", class_="text-sm text-muted-foreground truncate").text.strip(),
+            "description": card.find("p", class_="text-muted-foreground mb-4 line-clamp-2").text.strip(),
+            "baseline_stars": stats[0].text.strip() if len(stats) > 0 else "0",
+        }
+    except Exception as e:
+        print("Error parsing card:", e)
+        return None
 
-        if not await validate_link(session, link):
-            return None
 
-        created_by = card.find("p", class_="text-sm text-muted-foreground truncate").text.strip()
-        description = card.find("p", class_="text-muted-foreground mb-4 line-clamp-2").text.strip()
+def parse_listing(html: str, url: str, page: int, base_url: str = MCP_REGISTRY_BASE_URL):
+    # Runs in a parse pool worker: returns the page's cards and the next page URL, never the soup
+    soup = BeautifulSoup(html, "html.parser")
+    listings = [listing for listing in (parse_card(card, base_url) for card in soup.find_all("div", class_="p-6")) if listing]
+    return listings, next_page_url(soup, url, page)
 
-        stats = card.find_all("span", class_="flex items-center mr-3")
-        baseline_stars = stats[0].text.strip() if len(stats) > 0 else "0"
 
-        details_scraper = McpToolsScraper(link)
-        await details_scraper.fetch(session)
+async def process_card(fetcher, listing, parse_pool=None):
+    # Returns the detail page status with the record, so callers can tell a 404 from a network failure
+    try:
+        details_scraper = McpToolsScraper(listing["link"], parse_pool=parse_pool)
+        status = await details_scraper.fetch(fetcher)
+        if status != 200:
+            return status, None
 
         categories = await details_scraper.get_all_categories()
         language = await details_scraper.get_mcp_language()
         github_link = await details_scraper.get_mcp_author_github()
         stars = await details_scraper.get_stars()
-        stars = stars if stars else baseline_stars
+        stars = stars if stars else listing["baseline_stars"]
         markdown = "More description about MCP server" + await details_scraper.get_markdown()
 
-        # print({
-        #     "link":link,
-        #     "categories":categories,
-        #     "language":language,
-        #     "github link":github_link,
-        #     "stars":stars
-        # })
-
         content =  {
-            "title": title,
-            "link": link,
-            "created_by": created_by,
-            "description": description + markdown,
+            "title": listing["title"],
+            "link": listing["link"],
+            "created_by": listing["created_by"],
+            "description": listing["description"] + markdown,
             "stars": stars,
             "categories": categories,
             "language": language,
             "github_link": github_link
         }
-        return content
+        # Normalized here, at ingest, so later stages take the fields as they are
+        return status, McpServerRecord.from_raw(content)
+    except BrokenExecutor:
+        raise
     except Exception as e:
         print("Error parsing card:", e)
-        return None
-
-
-async def main():
-    mcp_registry_url = "https://www.mcpserverfinder.com/servers"
-
-    async with aiohttp.ClientSession() as session:
-        page = await session.get(mcp_registry_url)
-        content = await page.text()
-        soup = BeautifulSoup(content, "html.parser")
-        cards = soup.find_all("div", class_="p-6")
-
-        tasks = [process_card(session, card) for card in cards]
-        results_raw = await asyncio.gather(*tasks)
-        results = [res for res in results_raw if res]
-
-        with open('all_mcp_server.json', 'w', encoding='utf-16') as file:
-            json_instance = json.dumps(results, ensure_ascii=False)
-            file.write(json_instance)
+        return None, None
+
+
+async def crawl_registry(fetcher, store: RegistryStore, max_pages: int = SCRAPER_MAX_PAGES,
+                        concurrency: int = SCRAPER_CONCURRENCY, base_url: str = MCP_REGISTRY_BASE_URL,
+                        parse_pool: ParsePool = None):
+    # Listing pages are walked in order and feed a bounded queue drained by `concurrency` workers,
+    # so neither pending cards nor finished records pile up in memory
+    stats = fetcher.stats
+    parse_pool = parse_pool or ParsePool(workers=0)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    seen_links = set()
+    completed = store.completed_links()
+
+    async def worker():
+        while True:
+            listing = await queue.get()
+            try:
+                status, record = await process_card(fetcher, listing, parse_pool)
+                if record:
+                    # Committed per record, so an interrupted crawl keeps everything parsed so far;
+                    # the SQLite write runs off the loop so downloads carry on meanwhile
+                    await asyncio.to_thread(store.put, record)
+                    stats.records += 1
+                elif status is not None and status < 500 and status != 429:
+                    # Gone for good (e.g. 404): don't ask again on resume; transient failures are retried
+                    await asyncio.to_thread(store.skip, listing["link"], status)
+            finally:
+                queue.task_done()
+
+    async def produce():
+        url, page = f"{base_url}/servers", 1
+        while url and (not max_pages or page <= max_pages):
+            status, content = await fetcher.fetch(url)
+            if status != 200:
+                print(f"Stopping crawl, listing page {url} returned {status}")
+                break
+            cards, next_url = await parse_pool.run(parse_listing, content, url, page, base_url)
+            del content
+            listings = []
+            for listing in cards:
+                if listing["link"] not in seen_links:
+                    seen_links.add(listing["link"])
+                    listings.append(listing)
+            if not listings:
+                # Past the last page some registries repeat the final page instead of returning 404
+                break
+
+            stats.pages += 1
+            stats.cards += len(listings)
+            url, page = next_url, page + 1
+            for listing in listings:
+                if listing["link"] in completed:
+                    stats.resumed += 1
+                    continue
+                await queue.put(listing)
+            print(f"Listing page {page - 1}: {len(listings)} cards, {stats.records}/{stats.cards} scraped, "
+                f"{stats.resumed} already done, {stats.requests / (stats.elapsed or 1e-9):.1f} req/s")
+
+        await queue.join()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    producer = asyncio.create_task(produce())
+    try:
+        # Workers only end by failing (e.g. a broken parse pool); that aborts the crawl instead of stalling it
+        done, _ = await asyncio.wait([producer, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in [producer, *workers]:
+            task.cancel()
+        await asyncio.gather(producer, *workers, return_exceptions=True)
+
+
+async def main(max_pages: int = SCRAPER_MAX_PAGES, use_cache: bool = SCRAPER_HTTP_CACHE_ENABLED,
+            resume: bool = True, store_path: str = REGISTRY_STORE_PATH,
+            concurrency: int = SCRAPER_CONCURRENCY, base_url: str = MCP_REGISTRY_BASE_URL,
+            parse_workers: int = SCRAPER_PARSE_WORKERS):
+    stats = CrawlStats()
+    cache = HttpCache(SCRAPER_HTTP_CACHE_PATH) if use_cache else None
+    store = RegistryStore(store_path)
+    if not resume:
+        store.clear()
+    parse_pool = ParsePool(workers=parse_workers)
+    try:
+        async with create_session(concurrency=concurrency) as session:
+            await crawl_registry(
+                Fetcher(session, stats, cache=cache), store,
+                max_pages=max_pages, concurrency=concurrency, base_url=base_url, parse_pool=parse_pool
+            )
+    finally:
+        store.close()
+        parse_pool.close()
+        if cache:
+            cache.close()
+    print(f"Crawl finished: { {**stats.summary(), **parse_pool.stats()} }")
+    return stats
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Crawl the MCP server registry into the registry store")
+    parser.add_argument('--max-pages', type=int, default=SCRAPER_MAX_PAGES, help='Listing pages to walk, 0 for all')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the HTTP cache and download every page')
+    parser.add_argument('--restart', action='store_true', help='Empty the store and start over instead of resuming')
+    parser.add_argument('--store', default=REGISTRY_STORE_PATH, help='SQLite registry store records are written to')
+    parser.add_argument('--parse-workers', type=int, default=SCRAPER_PARSE_WORKERS,
+                        help='Processes parsing HTML, 0 to parse on the event loop')
+    args = parser.parse_args()
+    asyncio.run(main(
+        max_pages=args.max_pages,
+        use_cache=SCRAPER_HTTP_CACHE_ENABLED and not args.no_cache,
+        resume=not args.restart,
+        store_path=args.store,
+        parse_workers=args.parse_workers
+    ))
@@ -0,0 +1,66 @@
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from website_scraper.config import SCRAPER_EXTRACTOR, SCRAPER_PARSE_WORKERS, SCRAPER_PARSE_QUEUE
+from website_scraper.extractors import extract_fields, get_extractor
+
+
+class ParsePool:
+    """
+    Parsing stage of the crawl, run in worker processes.
+
+    Fetchers hand over raw HTML and get back plain dicts, so parsing uses
+    every core while the event loop keeps downloading. At most
+    `max_pending` pages are queued or being parsed; past that a fetcher
+    waits in `run` before starting its next download, which keeps
+    unparsed HTML from piling up (backpressure). With `workers=0` pages
+    are parsed inline on the loop.
+    """
+
+    def __init__(self, workers: int = SCRAPER_PARSE_WORKERS, max_pending: int = SCRAPER_PARSE_QUEUE,
+                extractor: str = SCRAPER_EXTRACTOR):
+        self.workers = workers
+        self.extractor = extractor
+        self.max_pending = max_pending or 2 * max(workers, 1)
+        # Spawned, not forked: the crawl process already runs an event loop and threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) if workers > 0 else None
+        self._inline_extractor = None if self._executor else get_extractor(extractor)
+        self._slots = None
+        self.parsed = 0
+        self.wait_seconds = 0.0
+
+    async def run(self, func, *args):
+        if self._executor is None:
+            self.parsed += 1
+            return func(*args)
+        if self._slots is None:
+            # Created lazily so the semaphore belongs to the running loop
+            self._slots = asyncio.Semaphore(self.max_pending)
+        started = time.perf_counter()
+        async with self._slots:
+            self.wait_seconds += time.perf_counter() - started
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, partial(func, *args))
+        self.parsed += 1
+        return result
+
+    async def extract(self, html: str) -> dict:
+        if self._executor is None:
+            self.parsed += 1
+            return self._inline_extractor.extract(html)
+        return await self.run(extract_fields, self.extractor, html)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "parse_workers": self.workers,
+            "pages_parsed": self.parsed,
+            "parse_backpressure_s": round(self.wait_seconds, 2),
+        }
@@ -1,73 +1,51 @@
-import aiohttp
-from bs4 import BeautifulSoup
+from concurrent.futures import BrokenExecutor
+from website_scraper.extractors import EMPTY_FIELDS, get_extractor
 
 
 class McpToolsScraper:
-    def __init__(self, mcp_tool_url):
+    def __init__(self, mcp_tool_url, extractor=None, parse_pool=None):
         self.url = mcp_tool_url
-        self.soup = None
-
-    async def fetch(self, session):
+        self.parse_pool = parse_pool
+        self.extractor = extractor or (None if parse_pool else get_extractor())
+        self.fields = None
+
+    async def fetch(self, fetcher):
+        # The status doubles as the link check, so a detail page is downloaded only once
+        status, html = await fetcher.fetch(self.url)
+        if status != 200:
+            return status
         try:
-            async with session.get(self.url, timeout=10) as response:
-                if response.status == 200:
-                    html = await response.text()
-                    self.soup = BeautifulSoup(html, "html.parser")
+            # Every field is extracted in one parse; the getters below only read the result
+            if self.parse_pool is not None:
+                # Parsed in a worker process, so the loop keeps downloading meanwhile
+                self.fields = await self.parse_pool.extract(html)
+            else:
+                self.fields = self.extractor.extract(html)
+        except BrokenExecutor:
+            # The parse pool itself is gone, so every later page would fail too: stop the crawl
+            raise
         except Exception as error:
             print(f"Error McpToolsScraper.fetch() URL {self.url}: {error}")
+            return None
+        return status
+
+    def _field(self, name):
+        if self.fields is None:
+            print(f"When running McpToolScraper.{name} the page {self.url} was not fetched")
+            return EMPTY_FIELDS[name]
+        return self.fields[name]
 
     async def get_all_categories(self):
-        try:
-            if len([tag.text.strip() for tag in self.soup.select("div.flex.flex-wrap span")]) <= 0:
-                return None
-            return [tag.text.strip() for tag in self.soup.select("div.flex.flex-wrap span")]
-        except Exception as error:
-            print(f"When running McpToolScraper.get_all_categories we got this error {error}")
-            return []
+        return self._field("categories")
 
     async def get_mcp_language(self):
-        try:
-            find_language = self.soup.find("h3", string="Language:").find_next_sibling("p")
-            if find_language is None:
-                return None
-            return find_language.text.strip()
-        except Exception as error:
-            print(f"When running McpToolScraper.get_mcp_language we got this error {error}")
-            return None
+        return self._field("language")
 
     async def get_mcp_author_github(self):
-        try:
-            github_link = self.soup.find_all("a")
-            for tag in github_link:
-                if "View on Github" in tag.get_text(strip=True):
-                #     # print("github url", tag['href'])
-                    return tag["href"]
-            return None
-        except Exception as error:
-            print(f"When running McpToolScraper.get_mcp_author_github we got this error {error}")
-            return None
+        return self._field("github_link")
 
     async def get_stars(self):
-        try:
-            divs = self.soup.find_all('div', class_='flex items-center')
-            for div in divs:
-                label = div.find('h3')
-                if label and label.text.strip() == 'Stars:':
-                    stars_text = div.find('p').text.strip()
-                    return stars_text
-                    break
-            return 0
-        except Exception as error:
-            print(f"When running McpToolScraper.get_stars we got this error {error}")
-            return None
+        return self._field("stars")
 
     async def get_markdown(self):
-        try:
-            divs = self.soup.find_all('div', class_="markdown-body")
-            all_markdown = ""
-            for div in divs:
-                all_markdown += div.get_text().strip("\n")
-            return all_markdown
-        except Exception as error:
-            print(f"When running McpToolScraper.get_markdown we got this error: {error}")
-            return None
+        return self._field("markdown")